@@ -8,27 +8,38 @@ Created on Thu Jan  2 15:44:48 2020
 from dlgo import agent
 from dlgo import goboard
 from dlgo import gotypes
-from dlgo.utils import print_board, print_move
+# Run with DLGO_PROFILE=1 to print per-phase timings of the engine at game end
+from dlgo import profiling  # noqa: F401
+from dlgo.render import BoardRenderer, clear_screen
+from dlgo.rng import spawn_rng
+from dlgo.utils import format_move
+import sys
 import time
 
-def main():
+def main(seed=None):
     board_size = 19
     game = goboard.GameState.new_game(board_size)
+    # Give each bot its own random stream; with a seed the game can be replayed exactly
     bots = {
-            gotypes.Player.black: agent.naive.RandomBot(),
-            gotypes.Player.white: agent.naive.RandomBot(),
+            gotypes.Player.black: agent.naive.RandomBot(spawn_rng(seed, 'black')),
+            gotypes.Player.white: agent.naive.RandomBot(spawn_rng(seed, 'white')),
     }
+    # Clear the screen once; afterwards only the points that change are redrawn
+    clear_screen()
+    renderer = BoardRenderer()
     total_move = 0
+    last_move = ''
     while not game.is_over():
         # Set a sleep timer to a slower 0.3 so that the printed moves can be observed 
         time.sleep(0.9)
-        # Clear the screen every move so that board is always printed at the same position
-        print(chr(27) + '[2J' + 'Total moves = ' + str(total_move))
-        print_board(game.board)
+        renderer.draw(game.board, 'Total moves = %d  %s' % (total_move, last_move))
         bot_move = bots[game.next_player].select_move(game)
-        print_move(game.next_player, bot_move)
+        last_move = format_move(game.next_player, bot_move)
         game = game.apply_move(bot_move)
         total_move+=1
+    renderer.draw(game.board, 'Total moves = %d  %s' % (total_move, last_move))
+    print()
         
 if __name__ == '__main__': 
-    main()
\ No newline at end of file
+    # Optional seed: python bot_v_bot.py 42
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else None)
\ No newline at end of file
@@ -4,4 +4,20 @@
 Created on Tue Nov  5 11:27:00 2019
 
 @author: Ian
-"""
\ No newline at end of file
+"""
+'''
+Submodules are imported on first use (PEP 562), so "import dlgo" costs nothing and
+dlgo.goboard, dlgo.agent, ... are only loaded by the programs that touch them.
+'''
+
+import importlib
+
+def __getattr__(name):
+    if name.startswith('_'):
+        raise AttributeError(name)
+    try:
+        return importlib.import_module('%s.%s' % (__name__, name))
+    except ModuleNotFoundError as error:
+        if error.name != '%s.%s' % (__name__, name):
+            raise
+        raise AttributeError('module %r has no attribute %r' % (__name__, name)) from None
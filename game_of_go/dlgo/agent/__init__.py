@@ -6,5 +6,36 @@ Created on Thu Jan  2 14:27:09 2020
 @author: Ian
 """
 
-from .base import *
-from .naive import *
\ No newline at end of file
+'''
+Agents are imported lazily: "from dlgo.agent import RandomBot" or "agent.naive"
+only loads the module that defines it (PEP 562).
+'''
+
+import importlib
+
+# name -> submodule that defines it
+_EXPORTS = {
+    'Agent': 'base',
+    'RandomBot': 'naive',
+    'BookBot': 'book',
+    'is_point_an_eye': 'helpers',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module('.' + _EXPORTS[name], __name__), name)
+        # Cache it, the next lookup won't come back here
+        globals()[name] = value
+        return value
+    if not name.startswith('_'):
+        try:
+            return importlib.import_module('.' + name, __name__)
+        except ModuleNotFoundError as error:
+            if error.name != '%s.%s' % (__name__, name):
+                raise
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
\ No newline at end of file
@@ -5,10 +5,14 @@ Created on Thu Jan  2 15:30:25 2020
 
 @author: Ian
 """
+import random
+
 # Interface: Bot selects a move based on current game play
 class Agent:
-    def __init__(self):
-        pass
+    def __init__(self, rng=None):
+        # Each agent draws from its own random.Random (see dlgo.rng), never from the
+        # global random module, so seeded games can be replayed exactly
+        self.rng = rng if rng is not None else random.Random()
     
     def select_move(self, game_state):
         raise NotImplementedError()
\ No newline at end of file
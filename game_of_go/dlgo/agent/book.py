@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 14:25:51 2026
+
+@author: Ian
+"""
+
+# Play from an opening book while the game is still in it
+from dlgo.agent.base import Agent
+
+class BookBot(Agent):
+    ''' 
+        BookBot:
+            1. Look the position up in the opening book
+            2. Pick one of the book moves, weighted by how often it was played
+            3. Fall back to another agent once the game leaves the book
+    '''
+    def __init__(self, book, fallback, rng=None):
+        Agent.__init__(self, rng)
+        self.book = book
+        self.fallback = fallback
+    
+    def select_move(self, game_state):
+        # A hash collision could suggest an illegal move, so check before trusting the book
+        candidates = [(move, count) for move, count in self.book.lookup(game_state)
+                      if game_state.is_valid_move(move)]
+        if not candidates:
+            return self.fallback.select_move(game_state)
+        moves = [move for move, _ in candidates]
+        weights = [count for _, count in candidates]
+        return self.rng.choices(moves, weights=weights)[0]
@@ -7,10 +7,9 @@ Created on Thu Jan  2 15:32:54 2020
 """
 
 # Build a naive bot, equivalent to a 30 kyu level absolute beginner
-import random
 from dlgo.agent.base import Agent
 from dlgo.agent.helpers import is_point_an_eye
-from dlgo.goboard_slow import Move
+from dlgo.goboard import Move
 from dlgo.gotypes import Point
 
 class RandomBot(Agent):
@@ -35,4 +34,4 @@ class RandomBot(Agent):
         # Pass if there is no valid move 
         if not candidates:
             return Move.pass_turn()
-        return Move.play(random.choice(candidates))
\ No newline at end of file
+        return Move.play(self.rng.choice(candidates))
\ No newline at end of file
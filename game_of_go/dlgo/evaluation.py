@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 09:44:26 2026
+
+@author: Ian
+"""
+
+'''
+In-process position evaluation service shared by concurrent games
+
+Agents (in different threads) ask for evaluations of GameStates. The service:
+    - answers from an LRU cache when the position was evaluated before
+    - merges requests for the same position that are still waiting, so it is
+      evaluated once (positions are keyed by board size, zobrist hash and player to move)
+    - collects the remaining positions into batches of up to max_batch_size, waiting
+      at most max_delay seconds for a batch to fill, and hands each batch to the evaluator
+
+The evaluator is any callable taking a list of GameStates and returning one result per
+state, in order. A NumPy evaluator would typically encode the batch into one array and
+run the model once per batch.
+
+Usage:
+    service = EvaluationService(evaluator)
+    value = service.evaluate(game_state)
+    ...
+    service.close()
+'''
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+__all__ = ['EvaluationService', 'position_key']
+
+def position_key(game_state):
+    board = game_state.board
+    return (board.num_rows, board.num_cols, board.zobrist_hash(), game_state.next_player)
+
+class EvaluationService():
+    def __init__(self, evaluator, max_batch_size=64, max_delay=0.002, cache_size=100000):
+        self.evaluator = evaluator
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.cache_size = cache_size
+        # position key -> result, least recently used first
+        self._cache = OrderedDict()
+        # position key -> (game state, [futures waiting for it]), in arrival order
+        self._pending = OrderedDict()
+        # Evaluations running right now: position key -> [futures waiting for it]
+        self._running = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._closed = False
+        self._counters = {'hits': 0, 'misses': 0, 'coalesced': 0,
+                          'batches': 0, 'evaluated': 0, 'evictions': 0}
+        self._worker = threading.Thread(target=self._run, name='dlgo-evaluation', daemon=True)
+        self._worker.start()
+
+    def submit(self, game_state):
+        # Returns a concurrent.futures.Future with the evaluation of the position
+        key = position_key(game_state)
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError('evaluation service is closed')
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._counters['hits'] += 1
+                future.set_result(self._cache[key])
+                return future
+            self._counters['misses'] += 1
+            waiting = self._running.get(key)
+            if waiting is None and key in self._pending:
+                waiting = self._pending[key][1]
+            if waiting is not None:
+                # Someone already asked for this position, share their evaluation
+                self._counters['coalesced'] += 1
+                waiting.append(future)
+                return future
+            self._pending[key] = (game_state, [future])
+            self._wake.notify()
+        return future
+
+    def evaluate(self, game_state):
+        return self.submit(game_state).result()
+
+    def evaluate_many(self, game_states):
+        futures = [self.submit(game_state) for game_state in game_states]
+        return [future.result() for future in futures]
+
+    def stats(self):
+        # misses counts every request not answered from the cache, coalesced
+        # the misses that shared an evaluation already under way
+        with self._lock:
+            result = dict(self._counters)
+            result['cache_size'] = len(self._cache)
+        lookups = result['hits'] + result['misses']
+        result['hit_rate'] = result['hits'] / lookups if lookups else 0.0
+        return result
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        # Evaluates what is still pending, then stops the worker thread
+        with self._lock:
+            self._closed = True
+            self._wake.notify()
+        self._worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _next_batch(self):
+        # Wait for the first request, then give others max_delay to join the batch
+        with self._lock:
+            while not self._pending and not self._closed:
+                self._wake.wait()
+            if not self._pending:
+                return None
+            deadline = time.monotonic() + self.max_delay
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._wake.wait(remaining)
+            batch = []
+            while self._pending and len(batch) < self.max_batch_size:
+                key, (game_state, futures) = self._pending.popitem(last=False)
+                self._running[key] = futures
+                batch.append((key, game_state))
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            try:
+                results = list(self.evaluator([game_state for _, game_state in batch]))
+                if len(results) != len(batch):
+                    raise ValueError('evaluator returned %d results for %d positions'
+                                     % (len(results), len(batch)))
+            except Exception as error:
+                with self._lock:
+                    waiting = [self._running.pop(key) for key, _ in batch]
+                for futures in waiting:
+                    for future in futures:
+                        future.set_exception(error)
+                continue
+            with self._lock:
+                self._counters['batches'] += 1
+                self._counters['evaluated'] += len(batch)
+                waiting = []
+                for (key, _), result in zip(batch, results):
+                    waiting.append((self._running.pop(key), result))
+                    self._cache[key] = result
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+                    self._counters['evictions'] += 1
+            for futures, result in waiting:
+                for future in futures:
+                    future.set_result(result)
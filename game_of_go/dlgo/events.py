@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 09:05:14 2026
+
+@author: Ian
+"""
+
+'''
+Move-by-move game events, for renderers, loggers and data collectors
+
+GameState.apply_move sends events to every callback subscribed to the game
+(GameState.subscribe). States made by apply_move inherit their parent's subscribers,
+so subscribing once at the start of a game covers the whole game.
+
+Events, in the order one move sends them:
+    StonePlaced(move_number, player, point)
+    StonesCaptured(move_number, color, points)   color: whose stones were captured
+    Passed(move_number, player)
+    Resigned(move_number, player)
+    GameOver(move_number, winner)                winner is None unless someone resigned
+
+Code that explores hypothetical moves (search, reading) should work on
+game_state.detached(), so the subscribers don't hear about moves that were never played.
+
+EventStream turns the callbacks into an async iterator:
+    stream = EventStream()
+    game.subscribe(stream)
+    async for event in stream:
+        ...
+'''
+
+import threading
+from collections import deque, namedtuple
+
+__all__ = ['StonePlaced', 'StonesCaptured', 'Passed', 'Resigned', 'GameOver',
+           'EventStream', 'emit_move_events']
+
+StonePlaced = namedtuple('StonePlaced', 'move_number player point')
+StonesCaptured = namedtuple('StonesCaptured', 'move_number color points')
+Passed = namedtuple('Passed', 'move_number player')
+Resigned = namedtuple('Resigned', 'move_number player')
+GameOver = namedtuple('GameOver', 'move_number winner')
+
+def emit_move_events(observers, move_number, player, move, captured, is_over):
+    # captured: the GoStrings the move removed from the board
+    events = []
+    if move.is_play:
+        events.append(StonePlaced(move_number, player, move.point))
+        if captured:
+            points = frozenset().union(*(string.stones for string in captured))
+            events.append(StonesCaptured(move_number, player.other, points))
+    elif move.is_pass:
+        events.append(Passed(move_number, player))
+    else:
+        events.append(Resigned(move_number, player))
+    if is_over:
+        winner = player.other if move.is_resign else None
+        events.append(GameOver(move_number, winner))
+    for event in events:
+        for observer in list(observers):
+            observer(event)
+
+class EventStream():
+    '''
+    a subscriber that can be iterated with async for, ending after GameOver
+
+    Events are buffered until they are read, so the stream can be made and
+    subscribed before any event loop runs, and moves may be played in another
+    thread: the loop that iterates the stream is woken when an event arrives.
+    '''
+    def __init__(self):
+        self._events = deque()
+        self._lock = threading.Lock()
+        # (loop, future) of an __anext__ waiting for the next event
+        self._waiter = None
+        self._done = False
+
+    def __call__(self, event):
+        with self._lock:
+            self._events.append(event)
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_wake, future)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._done:
+            raise StopAsyncIteration
+        future = None
+        with self._lock:
+            if not self._events:
+                # asyncio is only imported by async users, it is slow to import
+                import asyncio
+                loop = asyncio.get_running_loop()
+                future = loop.create_future()
+                self._waiter = (loop, future)
+        if future is not None:
+            await future
+        event = self._events.popleft()
+        if isinstance(event, GameOver):
+            # Hand out GameOver, then stop on the next call
+            self._done = True
+        return event
+
+def _wake(future):
+    # The waiting __anext__ may have been cancelled meanwhile
+    if not future.done():
+        future.set_result(None)
@@ -16,8 +16,9 @@ Exactly how this works:
 
 '''
 
-import random
+import sys
 from dlgo.gotypes import Player, Point
+from dlgo.rng import make_rng
 
 def to_python(player_state):
     if player_state is None:
@@ -31,12 +32,16 @@ MAX63 = 0x7fffffffffffffff
 table = {}
 empty_board = 0
 
+# Pass a seed on the command line to get the same table every time
+seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+rng = make_rng(seed)
+
 # The Go board is a 19 x 19 board
 for row in range(1, 20):
     for col in range(1, 20):
         #generate 19 x 19 x 2 hash values 
         for state in (Player.black, Player.white):
-            code = random.randint(0, MAX63)
+            code = rng.randint(0, MAX63)
             table[Point(row, col), state] = code 
         
 print('from .gotypes import Player, Point')
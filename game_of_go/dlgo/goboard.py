@@ -13,13 +13,16 @@ Created on Tue Nov  5 11:27:46 2019
 
 @author: Ian
 """
-import copy
-from dlgo.gotypes import Player
-from dlgo import zobrist
+from dlgo.events import emit_move_events
+from dlgo.gotypes import KoRule, Player
+from dlgo import symmetry
+from dlgo import tables
 
 # Goal: build class methods Move.play, Move.pass_turn, or Move.resign for an action in a round
 class Move():
     # Player can only make one actions per turn: play, pass, or resign
+    __slots__ = ('point', 'is_play', 'is_pass', 'is_resign')
+    
     def __init__(self, point=None, is_pass=False, is_resign=False):
         assert (point is not None) ^ is_pass ^ is_resign
         self.point = point
@@ -45,6 +48,8 @@ class Move():
 # Treat directly connectted Go stones as one GoString
 class GoString():
     # Easier manipulation for tracking liberties
+    __slots__ = ('color', 'stones', 'liberties')
+    
     def __init__(self, color, stones, liberties):
         self.color = color
         # Make stones and liberties immutable sets
@@ -79,13 +84,40 @@ class GoString():
             self.liberties == other.liberties
             
 class Board():
+    __slots__ = ('num_rows', 'num_cols', '_grid', '_hash', '_sym_hash', '_sym_codes',
+                 '_neighbors', '_hash_codes')
+    
     def __init__(self, num_rows, num_cols):
         # Board is an empty grid with certain rows and columns
         self.num_rows = num_rows
         self.num_cols = num_cols
         # _grid, a private dictionary keeps track of state of the board internally
         self._grid = {}
-        self._hash = zobrist.EMPTY_BOARD
+        self._hash = tables.empty_board_hash()
+        # Neighbour and zobrist tables are built once per board size (see dlgo.tables)
+        self._neighbors = tables.neighbor_table(num_rows, num_cols)
+        self._hash_codes = tables.hash_table(num_rows, num_cols)
+        # Zobrist hashes of the 8 symmetric images of the board, packed into one int
+        # (see dlgo.symmetry); the codes table is shared by all boards of this size
+        self._sym_hash = symmetry.empty_board_code()
+        self._sym_codes = symmetry.symmetry_codes(num_rows, num_cols)
+    
+    def copy(self):
+        # GoStrings are immutable, so boards can share them: copying the grid
+        # dictionary is all it takes, no need to deep copy every string
+        board = Board.__new__(Board)
+        board.num_rows = self.num_rows
+        board.num_cols = self.num_cols
+        board._grid = self._grid.copy()
+        board._hash = self._hash
+        board._sym_hash = self._sym_hash
+        board._sym_codes = self._sym_codes
+        board._neighbors = self._neighbors
+        board._hash_codes = self._hash_codes
+        return board
+    
+    def __deepcopy__(self, memo):
+        return self.copy()
     
     def is_on_grid(self, point):
         return 1 <= point.row <= self.num_rows and \
@@ -112,15 +144,15 @@ class Board():
         return string
 
     def place_stone(self, player, point):
+        # Returns the list of opponent strings the stone captured
         # To place stone: make sure that point has valid location and is unoccupied
         assert self.is_on_grid(point)
         assert self._grid.get(point) is None
         adjacent_same_color = []
         adjacent_opposite_color = []
         liberties = []
-        for neighbor in point.neighbors():
-            if not self.is_on_grid(neighbor):
-                continue # Break if neighbor not at a valid point: edge
+        # Only on-board neighbours are in the table, no need to check for the edge
+        for neighbor in self._neighbors[point]:
             neighbor_string = self._grid.get(neighbor)
             if neighbor_string is None:
                 liberties.append(neighbor)
@@ -139,16 +171,56 @@ class Board():
             self._grid[new_string_point] = new_string
         
         # Apply hash code for the point and the player
-        self._hash ^= zobrist.HASH_CODE[point, player]
+        self._hash ^= self._hash_codes[point, player]
+        self._sym_hash ^= self._sym_codes[point, player]
         
+        captured = []
         for other_color_string in adjacent_opposite_color:
             replacement = other_color_string.without_liberty(point)
             if replacement.num_liberties:
-                self._replace_string(other_color_string.without_liberty(point))
+                self._replace_string(replacement)
             else:
                 # Remove opposite color string if the move results in net ZERO liberty 
                 self._remove_string(other_color_string)
+                captured.append(other_color_string)
+        return captured
 
+    def make(self, player, point):
+        '''
+        places a stone like place_stone, and returns what unmake needs to take it back
+        
+        Used to read ahead (ladders, tactics) on one board without copying it.
+        Only the points the move can change are saved: the point itself, the strings
+        next to it and, for strings it captures, the strings that get a liberty back.
+        '''
+        grid = self._grid
+        neighbors = self._neighbors
+        saved = {point: grid.get(point)}
+        for neighbor in neighbors[point]:
+            neighbor_string = grid.get(neighbor)
+            if neighbor_string is None:
+                continue
+            for stone in neighbor_string.stones:
+                saved[stone] = neighbor_string
+            if neighbor_string.color != player and neighbor_string.num_liberties == 1:
+                # This string will be captured, its neighbours get their liberties back
+                for stone in neighbor_string.stones:
+                    for around in neighbors[stone]:
+                        around_string = grid.get(around)
+                        if around_string is not None and around_string is not neighbor_string:
+                            for around_stone in around_string.stones:
+                                saved[around_stone] = around_string
+        undo = (saved, self._hash, self._sym_hash)
+        self.place_stone(player, point)
+        return undo
+    
+    def unmake(self, undo):
+        # Restore the board to what it was before the make() that returned undo
+        saved, self._hash, self._sym_hash = undo
+        grid = self._grid
+        for point, string in saved.items():
+            grid[point] = string
+    
     def _replace_string(self, new_string):
         # Update grids
         for point in new_string.stones:
@@ -156,7 +228,7 @@ class Board():
     
     def _remove_string(self, string):
         for point in string.stones:
-            for neighbor in point.neighbors():
+            for neighbor in self._neighbors[point]:
                 neighbor_string = self._grid.get(neighbor)
                 if neighbor_string is None:
                     continue
@@ -164,10 +236,16 @@ class Board():
                     self._replace_string(neighbor_string.with_liberty(point))
             self._grid[point] = None
             # Removing a stone means unapplying the hash value of the stone
-            self._hash ^= zobrist.HASH_CODE[point, string.color]
+            self._hash ^= self._hash_codes[point, string.color]
+            self._sym_hash ^= self._sym_codes[point, string.color]
     
     def zobrist_hash(self):
         return self._hash
+    
+    def canonical_hash(self):
+        # Same value for all symmetric variants of the position, see dlgo.symmetry
+        # Returns (hash, k): symmetry k maps this board onto the canonical one
+        return symmetry.canonical(self._sym_hash, self.num_rows, self.num_cols)
 
 '''
 Each GameState instance is a per-round snapshot of the gameplay. 
@@ -176,41 +254,196 @@ In essense, GameState provides a bird-eye-view of the board with the exact posit
 It keeps a pointer to the previous state, allowing us to check the whole history and do comparison
 
 Helpful in the implementation of Ko rule, which I'll explain in the next section.
+
+Keeping search trees in memory:
+    - boards share their (immutable) GoStrings, so a new state only copies the grid dictionary
+    - compact() drops a state's board; it is rebuilt on demand by replaying the moves
+      from the nearest ancestor that still has one (the move is the diff to the parent)
+    - the ko history is not copied into every state: only every KO_CHECKPOINT-th state
+      keeps a frozenset of all earlier situations, the states in between are walked
+
+Ko rules (GameState.new_game(board_size, ko_rule=...), situational superko by default):
+    - situational superko: the history holds (board hash, player to move) keys
+    - positional superko: the same history, keyed on the board hash alone
+    - simple ko: no history at all; a move that captures a single stone with a single
+      stone left in atari marks the captured point, and only an immediate recapture
+      there is illegal
 '''
 
+# Every KO_CHECKPOINT-th state stores the full set of previous situations
+KO_CHECKPOINT = 16
+
+# A situation (next player, board hash) is stored as a single int:
+# the board hash with a fixed code mixed in when white is to play
+_PLAYER_CODE = {
+    Player.black: 0,
+    Player.white: 0x2545f4914f6cdd1d,
+}
+
+def situation_key(player, board_hash):
+    # What situational superko remembers: the stones and the player to move
+    return board_hash ^ _PLAYER_CODE[player]
+
+def _ko_point(board, point, captured):
+    # A single stone captured by a single stone that is left in atari:
+    # taking back right away at the captured point would repeat the position
+    if len(captured.stones) != 1:
+        return None
+    string = board.get_go_string(point)
+    if len(string.stones) == 1 and string.num_liberties == 1:
+        return next(iter(captured.stones))
+    return None
+
 class GameState():
-    def __init__(self, board, next_player, previous, move):
-        self.board = board
+    __slots__ = ('_board', 'next_player', 'previous_state', 'last_move', '_hash',
+                 '_depth', '_situations', '_is_over', '_legal_points', '_probe',
+                 '_observers', 'ko_rule', '_ko_point')
+    
+    def __init__(self, board, next_player, previous, move, ko_rule=None, ko_point=None):
+        self._board = board
         self.next_player = next_player
         self.previous_state = previous 
-        # Given an empty board, self.previous_states is an emoty immutable frozenset
-        if self.previous_state is None:
-            self.previous_states = frozenset()
-        # If board has stones on it, describe the states in the color of next player
-        # and zobrist hash of the previous game state 
-        else:
-            self.previous_states = frozenset(
-                previous.previous_states |
-                {(previous.next_player, previous.board.zobrist_hash())})
         self.last_move = move
+        self._hash = board.zobrist_hash()
+        self._depth = 0 if previous is None else previous._depth + 1
+        if ko_rule is None:
+            ko_rule = KoRule.situational_superko if previous is None else previous.ko_rule
+        self.ko_rule = ko_rule
+        # Simple ko: the point the next player may not play right now, if any
+        self._ko_point = ko_point
+        # Checkpoint states keep the situations of themselves and all their ancestors
+        self._situations = None
+        if self._depth % KO_CHECKPOINT == 0 and ko_rule is not KoRule.simple:
+            self._situations = self._collect_situations()
+        # Whether the game is over never changes for a state, so work it out once
+        self._is_over = self._compute_is_over()
+        # Legality of each point already checked in this position: point -> bool
+        # Created on first use; a new state (from apply_move) starts without one
+        self._legal_points = None
+        # Last hypothetical board, shared by the self-capture and ko checks
+        self._probe = None
+        # Event callbacks (see dlgo.events), shared by all the states of a game
+        self._observers = [] if previous is None else previous._observers
+    
+    @property
+    def board(self):
+        if self._board is None:
+            self._board = self._materialize_board()
+        return self._board
+    
+    def compact(self):
+        # Drop the board and the legality cache to save memory;
+        # the first game state always keeps its board
+        if self.previous_state is not None:
+            self._board = None
+        self._legal_points = None
+        self._probe = None
+        return self
+    
+    def _materialize_board(self):
+        # Find the closest ancestor that still holds a board and replay the moves from there
+        pending = []
+        state = self
+        while state._board is None:
+            pending.append(state.last_move)
+            state = state.previous_state
+        board = state._board.copy()
+        player = state.next_player
+        for move in reversed(pending):
+            if move.is_play:
+                board.place_stone(player, move.point)
+            player = player.other
+        return board
+    
+    @property
+    def situation_key(self):
+        return self._history_key(self.next_player, self._hash)
+    
+    def _history_key(self, player, board_hash):
+        # What the superko history remembers a position by
+        if self.ko_rule is KoRule.positional_superko:
+            return board_hash
+        return situation_key(player, board_hash)
+    
+    def _collect_situations(self):
+        # Situations since the last checkpoint, plus everything that checkpoint knows
+        keys = []
+        state = self
+        while state is not None and (state is self or state._situations is None):
+            keys.append(state.situation_key)
+            state = state.previous_state
+        if state is None:
+            return frozenset(keys)
+        return state._situations.union(keys)
+    
+    def _situation_seen(self, key):
+        # True if this state or one of its ancestors has the situation key.
+        # At most KO_CHECKPOINT states are walked before a checkpoint answers.
+        state = self
+        while state is not None:
+            if state._situations is not None:
+                return key in state._situations
+            if state.situation_key == key:
+                return True
+            state = state.previous_state
+        return False
+    
+    @property
+    def previous_states(self):
+        # The (player, zobrist hash) situations of all earlier states of this game
+        situations = set()
+        state = self.previous_state
+        while state is not None:
+            situations.add((state.next_player, state._hash))
+            state = state.previous_state
+        return frozenset(situations)
         
     def apply_move(self, move):
+        captured = None
+        ko_point = None
         if move.is_play:
-            next_board = copy.deepcopy(self.board)
-            next_board.place_stone(self.next_player, move.point)
+            next_board = self.board.copy()
+            captured = next_board.place_stone(self.next_player, move.point)
+            if len(captured) == 1:
+                ko_point = _ko_point(next_board, move.point, captured[0])
         else:
             next_board = self.board
-        return GameState(next_board, self.next_player.other, self, move)
+        next_state = GameState(next_board, self.next_player.other, self, move,
+                               self.ko_rule, ko_point)
+        if self._observers:
+            emit_move_events(self._observers, next_state._depth, self.next_player,
+                             move, captured, next_state.is_over())
+        return next_state
+    
+    def subscribe(self, callback):
+        # callback(event) is called for every move played from now on in this game
+        self._observers.append(callback)
+    
+    def unsubscribe(self, callback):
+        self._observers.remove(callback)
+    
+    def detached(self):
+        # The same position without subscribers, for trying out moves
+        state = GameState.__new__(GameState)
+        for name in GameState.__slots__:
+            setattr(state, name, getattr(self, name))
+        state._observers = []
+        state._legal_points = None
+        state._probe = None
+        return state
     
     @classmethod
-    def new_game(cls, board_size):
+    def new_game(cls, board_size, ko_rule=KoRule.situational_superko):
         if isinstance(board_size, int):
             board_size = (board_size, board_size)
         board = Board(*board_size)
-        return GameState(board, Player.black, None, None)
+        return GameState(board, Player.black, None, None, ko_rule)
     
     # Deciding when a game of Go is over
     def is_over(self):
+        return self._is_over
+    
+    def _compute_is_over(self):
         if self.last_move is None:
             return False
         if self.last_move.is_resign:
@@ -219,7 +452,7 @@ class GameState():
         if second_last_move is None:
             return False
         # Two consecutive passes means over
-        return self.last_move.is_pass and second_last_move.is_pass 
+        return self.last_move.is_pass and second_last_move.is_pass
     
     '''
     Illegal moves:
@@ -250,8 +483,7 @@ class GameState():
             #Self capture is False when the player isn't playing in his own round
             return False
         # Check self capture by hypothetically placing a stone on that point on a "dummie" board
-        next_board = copy.deepcopy(self.board)
-        next_board.place_stone(player, move.point)
+        next_board = self._board_after(player, move.point)
         new_string = next_board.get_go_string(move.point)
         #Again, self capture is when the resulting Go string from the move has 0 liberty
         return new_string.num_liberties == 0
@@ -262,16 +494,29 @@ class GameState():
         return (self.next_player, self.board)
     
     
+    def _board_after(self, player, point):
+        # is_valid_move asks for the same hypothetical board twice in a row
+        # (self capture, then ko), so keep the last one instead of copying again
+        probe = self._probe
+        if probe is not None and probe[0] == player and probe[1] == point:
+            return probe[2]
+        next_board = self.board.copy()
+        next_board.place_stone(player, point)
+        self._probe = (player, point, next_board)
+        return next_board
+    
     def does_move_violate_ko(self, player, move):
         # Ko rule is NOT violated if the game state remains static due to pass or resign
         if not move.is_play:
             return False
+        # Simple ko only looks at the last capture, no board needed
+        if self.ko_rule is KoRule.simple:
+            return move.point == self._ko_point and player == self.next_player
         # Make move in a copied board to hypothetically test out the step
-        next_board = copy.deepcopy(self.board)
-        next_board.place_stone(player, move.point)
-        next_situation = (player.other, next_board.zobrist_hash())
+        next_board = self._board_after(player, move.point)
+        next_situation = self._history_key(player.other, next_board.zobrist_hash())
         # Violates the Ko rule if the next situation repeat previous game states
-        return next_situation in self.previous_states
+        return self._situation_seen(next_situation)
         
     def is_valid_move(self, move):
         # Invalid move when game is over
@@ -280,11 +525,21 @@ class GameState():
         # Pass or Resign are valid moves
         if move.is_pass or move.is_resign:
             return True
+        # Points already checked in this position are answered from the cache
+        if self._legal_points is None:
+            self._legal_points = {}
+        legal = self._legal_points.get(move.point)
+        if legal is not None:
+            return legal
         # Else, check if the move is illegal by the three rules
-        return (
+        legal = (
             # Check to see if player places stone on a valid point
             self.board.get(move.point) is None and
             # Check to see if the placement leads to a self capture
             not self.is_move_self_capture(self.next_player, move) and
             # Check to see if the placement violate the Ko rule
-            not self.does_move_violate_ko(self.next_player, move))
\ No newline at end of file
+            not self.does_move_violate_ko(self.next_player, move))
+        self._legal_points[move.point] = legal
+        # The probe board is only useful within this check
+        self._probe = None
+        return legal
\ No newline at end of file
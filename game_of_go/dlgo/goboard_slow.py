@@ -73,6 +73,19 @@ class Board():
         # _grid, a private dictionary keeps track of state of the board internally
         self._grid = {}
     
+    def __eq__(self, other):
+        # Two boards are the same position when the same stones sit on the same points.
+        # Without this, comparing situations for the Ko rule compared board objects
+        # by identity and never found a repeated position.
+        return isinstance(other, Board) and \
+            self.num_rows == other.num_rows and \
+            self.num_cols == other.num_cols and \
+            self._stones() == other._stones()
+    
+    def _stones(self):
+        return {point: string.color for point, string in self._grid.items()
+                if string is not None}
+    
     def is_on_grid(self, point):
         return 1 <= point.row <= self.num_rows and \
                 1 <= point.col <= self.num_cols
@@ -19,6 +19,14 @@ class Player(enum.Enum):
         # Call this method on a Player instance to switch player
         return Player.black if self == Player.white else Player.white 
 
+class KoRule(enum.Enum):
+    # simple: no immediate recapture of a single-stone ko
+    # positional_superko: no board position may repeat
+    # situational_superko: no (board position, player to move) may repeat
+    simple = 1
+    positional_superko = 2
+    situational_superko = 3
+
 # Named tuple for better readibility
 class Point(namedtuple('Point', 'row col')):
     def neighbors(self):
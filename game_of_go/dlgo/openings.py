@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 13:40:05 2026
+
+@author: Ian
+"""
+
+'''
+Opening book built from recorded games
+
+Building:
+    - replay the first max_moves moves of every recorded game
+    - count how often each move was played from each position, where a position is
+      the zobrist hash of the board plus the player to move
+    - write the counts as fixed-size records sorted by (hash, player)
+
+Looking up:
+    - the book file is memory-mapped, nothing is loaded up front
+    - a binary search over the sorted records finds the position, and the records
+      next to it are the candidate moves, weighted by how often they were played
+
+A recorded game is a sequence of moves, either Move objects or strings
+such as 'D4', 'pass' and 'resign'.
+'''
+
+import mmap
+import struct
+from dlgo import goboard
+from dlgo.gotypes import Point
+from dlgo.utils import point_from_coords
+
+__all__ = ['build_book', 'OpeningBook']
+
+MAGIC = b'DLGOBOOK'
+VERSION = 1
+# magic, version, board rows, board columns, number of records
+HEADER = struct.Struct('<8sHBBI')
+# board hash, player to move, row, column, (padding), times played
+RECORD = struct.Struct('<QBBBxI')
+
+def _to_move(item):
+    if isinstance(item, goboard.Move):
+        return item
+    text = item.strip()
+    if text.lower() == 'pass':
+        return goboard.Move.pass_turn()
+    if text.lower() == 'resign':
+        return goboard.Move.resign()
+    return goboard.Move.play(point_from_coords(text.upper()))
+
+def build_book(games, path, board_size=19, max_moves=30, min_count=1):
+    '''
+    replays the opening of every game and writes the book to path
+
+    Moves played fewer than min_count times are left out.
+    Returns the number of records written.
+    '''
+    if isinstance(board_size, int):
+        board_size = (board_size, board_size)
+    counts = {}
+    for moves in games:
+        game = goboard.GameState.new_game(board_size)
+        for number, item in enumerate(moves):
+            if number >= max_moves or game.is_over():
+                break
+            # Stop at the first unreadable or illegal move, the rest of the record
+            # can't be trusted
+            try:
+                move = _to_move(item)
+            except (ValueError, AttributeError):
+                break
+            if move.is_play and not game.board.is_on_grid(move.point):
+                break
+            if not game.is_valid_move(move):
+                break
+            if move.is_play:
+                key = (game.board.zobrist_hash(), game.next_player.value,
+                       move.point.row, move.point.col)
+                counts[key] = counts.get(key, 0) + 1
+            game = game.apply_move(move)
+    records = sorted(key for key, count in counts.items() if count >= min_count)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, board_size[0], board_size[1], len(records)))
+        for key in records:
+            f.write(RECORD.pack(*key, counts[key]))
+    return len(records)
+
+class OpeningBook():
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, num_rows, num_cols, self.num_records = HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError('%s is not a dlgo opening book' % path)
+        self.board_size = (num_rows, num_cols)
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _record(self, index):
+        return RECORD.unpack_from(self._data, HEADER.size + index * RECORD.size)
+
+    def _first_index(self, board_hash, player_value):
+        # Binary search for the first record of the position (lower bound)
+        target = (board_hash, player_value)
+        low, high = 0, self.num_records
+        while low < high:
+            middle = (low + high) // 2
+            record = self._record(middle)
+            if (record[0], record[1]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def lookup(self, game_state):
+        '''
+        returns the book moves for the position as a list of (Move, times played),
+        most played first; an empty list if the position is not in the book
+        '''
+        board = game_state.board
+        if (board.num_rows, board.num_cols) != self.board_size:
+            return []
+        board_hash = board.zobrist_hash()
+        player_value = game_state.next_player.value
+        candidates = []
+        index = self._first_index(board_hash, player_value)
+        while index < self.num_records:
+            record_hash, record_player, row, col, count = self._record(index)
+            if record_hash != board_hash or record_player != player_value:
+                break
+            candidates.append((goboard.Move.play(Point(row=row, col=col)), count))
+            index += 1
+        candidates.sort(key=lambda candidate: -candidate[1])
+        return candidates
+
+    def __contains__(self, game_state):
+        return bool(self.lookup(game_state))
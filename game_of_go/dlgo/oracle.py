@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Thu Oct 22 13:48:30 2026
+
+@author: Ian
+"""
+
+'''
+Differential testing: cross-check a board engine against dlgo.goboard_slow
+
+goboard_slow is the reference: plain sets, deep copies and a full history walk for ko.
+A candidate engine (dlgo.goboard by default, or any module with the same GameState and
+Move API) plays the same random moves in lockstep with it, and after every move we check:
+    - both engines agree on whether the move is legal (occupied, self capture, ko)
+    - the same stones are on the same points (so captures agree)
+    - the candidate's zobrist hash (and its symmetric hashes) match a hash recomputed
+      from scratch from the stones on the board
+    - both agree on whether the game is over
+Every few moves the legality of every point of the board is compared, not just the
+move being played.
+
+When a game fails, its move list is shrunk (delta debugging) to a short sequence that
+still fails, which makes a readable reproduction. Games are spread over a process pool;
+game i always uses the random stream spawn_rng(seed, i), so failures can be replayed.
+
+    python -m dlgo.oracle --games 1000 --moves 200 --size 9 --processes 8
+'''
+
+import argparse
+import importlib
+from multiprocessing import Pool
+from dlgo import goboard_slow
+from dlgo import symmetry
+from dlgo import tables
+from dlgo.gotypes import Point
+from dlgo.rng import spawn_rng
+from dlgo.utils import coords_from_point, point_from_coords
+
+__all__ = ['find_mismatch', 'shrink', 'random_game', 'check_game', 'run_oracle']
+
+# The legality of every point is compared every FULL_CHECK_INTERVAL moves
+FULL_CHECK_INTERVAL = 10
+
+def _move(engine, text):
+    if text == 'pass':
+        return engine.Move.pass_turn()
+    return engine.Move.play(point_from_coords(text))
+
+def _expected_hashes(board, stones):
+    # Zobrist hash and packed symmetric hashes, recomputed from the stones alone
+    codes = tables.hash_table(board.num_rows, board.num_cols)
+    sym_codes = symmetry.symmetry_codes(board.num_rows, board.num_cols)
+    plain = tables.empty_board_hash()
+    packed = symmetry.empty_board_code()
+    for point, color in stones.items():
+        plain ^= codes[point, color]
+        packed ^= sym_codes[point, color]
+    return plain, packed
+
+def _stones(board):
+    stones = {}
+    for row in range(1, board.num_rows + 1):
+        for col in range(1, board.num_cols + 1):
+            color = board.get(Point(row, col))
+            if color is not None:
+                stones[Point(row, col)] = color
+    return stones
+
+def _compare_legality(reference, candidate, candidate_engine, points):
+    for point in points:
+        expected = reference.is_valid_move(goboard_slow.Move.play(point))
+        actual = candidate.is_valid_move(candidate_engine.Move.play(point))
+        if expected != actual:
+            return 'legality of %s: reference says %s, candidate says %s' % (
+                coords_from_point(point), expected, actual)
+    return None
+
+def find_mismatch(moves, board_size=9, engine='dlgo.goboard', full_check_interval=FULL_CHECK_INTERVAL):
+    '''
+    plays moves ('D4' / 'pass') on both engines; returns a description of the first
+    difference, or None if they agree all the way
+
+    Moves both engines reject are skipped, so any subsequence of a game is a valid test.
+    '''
+    candidate_engine = importlib.import_module(engine)
+    reference = goboard_slow.GameState.new_game(board_size)
+    candidate = candidate_engine.GameState.new_game(board_size)
+    board = reference.board
+    all_points = [Point(row, col) for row in range(1, board.num_rows + 1)
+                  for col in range(1, board.num_cols + 1)]
+    for number, text in enumerate(moves, 1):
+        expected = reference.is_valid_move(_move(goboard_slow, text))
+        actual = candidate.is_valid_move(_move(candidate_engine, text))
+        if expected != actual:
+            return 'move %d (%s): reference legal=%s, candidate legal=%s' % (
+                number, text, expected, actual)
+        if not expected:
+            continue
+        reference = reference.apply_move(_move(goboard_slow, text))
+        candidate = candidate.apply_move(_move(candidate_engine, text))
+        stones = _stones(reference.board)
+        if _stones(candidate.board) != stones:
+            return 'move %d (%s): stones on the board differ' % (number, text)
+        if reference.is_over() != candidate.is_over():
+            return 'move %d (%s): reference over=%s, candidate over=%s' % (
+                number, text, reference.is_over(), candidate.is_over())
+        full_check = number % full_check_interval == 0
+        if full_check or text == 'pass':
+            plain, packed = _expected_hashes(candidate.board, stones)
+            if candidate.board.zobrist_hash() != plain:
+                return 'move %d (%s): zobrist hash differs from recomputed hash' % (number, text)
+            if getattr(candidate.board, '_sym_hash', packed) != packed:
+                return 'move %d (%s): symmetric hashes differ from recomputed ones' % (number, text)
+        if full_check and not reference.is_over():
+            problem = _compare_legality(reference, candidate, candidate_engine, all_points)
+            if problem is not None:
+                return 'after move %d: %s' % (number, problem)
+    return None
+
+def shrink(moves, fails):
+    '''
+    delta debugging: removes chunks of moves as long as fails(moves) stays true,
+    down to single moves; returns the shortest failing list found
+    '''
+    moves = list(moves)
+    chunk = max(len(moves) // 2, 1)
+    while chunk >= 1:
+        start = 0
+        while start < len(moves):
+            candidate = moves[:start] + moves[start + chunk:]
+            if candidate and fails(candidate):
+                moves = candidate
+            else:
+                start += chunk
+        if chunk == 1:
+            break
+        chunk //= 2
+    return moves
+
+def random_game(rng, board_size, num_moves, pass_rate=0.03):
+    # Random points, legal or not (illegal ones are part of the test), and a few passes
+    if isinstance(board_size, int):
+        board_size = (board_size, board_size)
+    num_rows, num_cols = board_size
+    moves = []
+    for _ in range(num_moves):
+        if rng.random() < pass_rate:
+            moves.append('pass')
+        else:
+            point = Point(rng.randint(1, num_rows), rng.randint(1, num_cols))
+            moves.append(coords_from_point(point))
+    return moves
+
+def check_game(job):
+    '''
+    one oracle game: returns None, or (game index, problem, shrunk moves)
+    '''
+    seed, game_index, board_size, num_moves, engine = job
+    moves = random_game(spawn_rng(seed, game_index), board_size, num_moves)
+    problem = find_mismatch(moves, board_size, engine)
+    if problem is None:
+        return None
+    # While shrinking, compare every point after every move: the full check must not
+    # depend on where the move numbers happen to fall
+    fails = lambda candidate: find_mismatch(candidate, board_size, engine, 1) is not None
+    shrunk = shrink(moves, fails)
+    return (game_index, find_mismatch(shrunk, board_size, engine, 1), shrunk)
+
+def run_oracle(num_games, num_moves=200, board_size=9, seed=0, engine='dlgo.goboard',
+               processes=None, stop_after=1):
+    '''
+    plays num_games random games on both engines; returns the failures found,
+    as (game index, problem, shrunk moves), stopping after stop_after of them
+    '''
+    jobs = [(seed, index, board_size, num_moves, engine) for index in range(num_games)]
+    failures = []
+    if processes == 1:
+        results = map(check_game, jobs)
+        for result in results:
+            if result is not None:
+                failures.append(result)
+                if len(failures) >= stop_after:
+                    break
+        return failures
+    with Pool(processes) as pool:
+        for result in pool.imap_unordered(check_game, jobs, chunksize=4):
+            if result is not None:
+                failures.append(result)
+                if len(failures) >= stop_after:
+                    pool.terminate()
+                    break
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-check a board engine against goboard_slow')
+    parser.add_argument('--games', type=int, default=200)
+    parser.add_argument('--moves', type=int, default=200)
+    parser.add_argument('--size', type=int, default=9)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--engine', default='dlgo.goboard')
+    parser.add_argument('--processes', type=int, default=None)
+    args = parser.parse_args()
+    failures = run_oracle(args.games, args.moves, args.size, args.seed, args.engine, args.processes)
+    if not failures:
+        print('%d games, %d moves each: no differences' % (args.games, args.moves))
+        return
+    for game_index, problem, moves in failures:
+        print('game %d: %s' % (game_index, problem))
+        print('reproduce with: %s' % ' '.join(moves))
+
+if __name__ == '__main__':
+    main()
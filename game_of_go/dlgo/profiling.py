@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 09:12:40 2026
+
+@author: Ian
+"""
+
+'''
+Opt-in per-phase profiling for dlgo.goboard
+
+How it works:
+    - enable() swaps the hot methods of Board, GoString and GameState for
+      wrappers that count calls and time them with perf_counter
+    - disable() puts the original methods back
+
+While disabled, the classes hold their original methods, so there is no
+extra cost at all and the hooks can stay in place in production.
+
+Timings are inclusive: place_stone includes the merges and captures it triggers.
+
+Usage:
+    from dlgo import profiling
+    profiling.enable()
+    ... play games ...
+    profiling.report()
+
+Setting the DLGO_PROFILE environment variable turns profiling on at import time.
+'''
+
+import os
+import sys
+import time
+from dlgo import goboard
+
+__all__ = ['enable', 'disable', 'is_enabled', 'reset', 'stats', 'report']
+
+# (owner, attribute name, phase name) of every instrumented call
+PHASES = [
+    (goboard.Board, 'place_stone', 'place_stone'),
+    (goboard.GoString, 'merged_with', 'merge'),
+    (goboard.Board, '_remove_string', 'remove_string'),
+    (goboard.Board, 'copy', 'board_copy'),
+    (goboard.GameState, 'does_move_violate_ko', 'ko_check'),
+    (goboard.GameState, 'is_move_self_capture', 'self_capture_check'),
+]
+
+# phase name -> [number of calls, total seconds]
+_counters = {}
+# Stones removed from the board by captures
+_captured = [0]
+# (owner, attribute name) -> original attribute, only filled while enabled
+_originals = {}
+
+def _timed(phase, func):
+    counter = _counters.setdefault(phase, [0, 0.0])
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            counter[0] += 1
+            counter[1] += time.perf_counter() - start
+    wrapper.__name__ = func.__name__
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+def _counting_captures(func):
+    def wrapper(board, string):
+        # _remove_string is only ever called on captured strings
+        _captured[0] += len(string.stones)
+        return func(board, string)
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+def _dumping_at_game_end(func):
+    def wrapper(game_state, move):
+        next_state = func(game_state, move)
+        if next_state.is_over():
+            report()
+        return next_state
+    wrapper.__name__ = func.__name__
+    return wrapper
+
+def _install(owner, name, replacement):
+    _originals[owner, name] = getattr(owner, name)
+    setattr(owner, name, replacement)
+
+def enable():
+    # Enabling twice would wrap the wrappers, so do nothing if already on
+    if _originals:
+        return
+    for owner, name, phase in PHASES:
+        func = getattr(owner, name)
+        if name == '_remove_string':
+            func = _counting_captures(func)
+        _install(owner, name, _timed(phase, func))
+    _install(goboard.GameState, 'apply_move',
+             _dumping_at_game_end(goboard.GameState.apply_move))
+
+def disable():
+    for (owner, name), original in _originals.items():
+        setattr(owner, name, original)
+    _originals.clear()
+
+def is_enabled():
+    return bool(_originals)
+
+def reset():
+    for counter in _counters.values():
+        counter[0] = 0
+        counter[1] = 0.0
+    _captured[0] = 0
+
+def stats():
+    '''
+    returns a snapshot of the counters:
+        {phase: {'calls': int, 'seconds': float}, ..., 'captured_stones': int}
+    '''
+    result = {}
+    for _, _, phase in PHASES:
+        calls, seconds = _counters.get(phase, (0, 0.0))
+        result[phase] = {'calls': calls, 'seconds': seconds}
+    result['captured_stones'] = _captured[0]
+    return result
+
+def report(out=None):
+    # Print one line per phase, slowest phase first
+    out = out or sys.stderr
+    snapshot = stats()
+    captured = snapshot.pop('captured_stones')
+    print('%-20s %10s %12s %10s' % ('phase', 'calls', 'total (s)', 'avg (us)'), file=out)
+    for phase, counter in sorted(snapshot.items(), key=lambda item: -item[1]['seconds']):
+        calls, seconds = counter['calls'], counter['seconds']
+        avg = 1e6 * seconds / calls if calls else 0.0
+        print('%-20s %10d %12.4f %10.2f' % (phase, calls, seconds, avg), file=out)
+    print('%-20s %10d' % ('captured_stones', captured), file=out)
+
+if os.environ.get('DLGO_PROFILE'):
+    enable()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 11:02:17 2026
+
+@author: Ian
+"""
+
+'''
+Incremental terminal rendering of Go boards
+
+print_board prints every point of the board on every move. BoardRenderer instead
+remembers what it has drawn and, after the first full frame, only sends ANSI
+cursor-addressed updates for the points that changed (and for the status line).
+
+Several renderers with different origins can share one screen, which is what
+TiledRenderer does to watch many games at once.
+
+The layout is the same as print_board:
+
+    status line
+    19  .  .  x ...
+    ...
+     1  .  .  . ...
+        A  B  C ...
+'''
+
+import sys
+from dlgo import gotypes
+from dlgo.utils import STONE_TO_CHAR, column_header
+
+__all__ = ['BoardRenderer', 'TiledRenderer', 'clear_screen']
+
+ESC = chr(27)
+
+def _goto(line, column):
+    # ANSI cursor position, both 1-based
+    return '%s[%d;%dH' % (ESC, line, column)
+
+def clear_screen(out=None):
+    out = out or sys.stdout
+    out.write(ESC + '[2J')
+    out.flush()
+
+class BoardRenderer():
+    def __init__(self, top=1, left=1, out=None, park=True):
+        # Screen position (1-based) of the status line's first character
+        self.top = top
+        self.left = left
+        self.out = out or sys.stdout
+        # Leave the cursor on the line below the frame after a draw
+        self.park = park
+        # point -> stone as last drawn, None until the first full frame
+        self._drawn = None
+        self._status = None
+        self._size = None
+
+    def width(self, board):
+        return 3 + 3 * board.num_cols
+
+    def height(self, board):
+        # status line, board rows and the column letters
+        return board.num_rows + 2
+
+    def _point_position(self, board, point):
+        # Each row starts with a 3 character label, each point is 3 characters wide
+        line = self.top + 1 + board.num_rows - point.row
+        column = self.left + 3 + 3 * (point.col - 1) + 1
+        return line, column
+
+    def reset(self):
+        # Forget what has been drawn: the next draw is a full frame
+        self._drawn = None
+        self._status = None
+
+    def draw(self, board, status=''):
+        if self._drawn is None or self._size != (board.num_rows, board.num_cols):
+            chunks = self._full_frame(board, status)
+        else:
+            chunks = self._changes(board, status)
+        if chunks:
+            if self.park:
+                chunks.append(_goto(self.top + self.height(board), self.left))
+            self.out.write(''.join(chunks))
+            self.out.flush()
+
+    def _full_frame(self, board, status):
+        self._size = (board.num_rows, board.num_cols)
+        self._drawn = {}
+        chunks = [_goto(self.top, self.left), status.ljust(self.width(board))]
+        for row in range(board.num_rows, 0, -1):
+            line = []
+            for col in range(1, board.num_cols + 1):
+                point = gotypes.Point(row=row, col=col)
+                stone = board.get(point)
+                self._drawn[point] = stone
+                line.append(STONE_TO_CHAR[stone])
+            chunks.append(_goto(self.top + 1 + board.num_rows - row, self.left))
+            chunks.append('%2d %s' % (row, ''.join(line)))
+        chunks.append(_goto(self.top + 1 + board.num_rows, self.left))
+        chunks.append(column_header(board.num_cols))
+        self._status = status
+        return chunks
+
+    def _changes(self, board, status):
+        chunks = []
+        if status != self._status:
+            chunks.append(_goto(self.top, self.left))
+            chunks.append(status.ljust(self.width(board)))
+            self._status = status
+        drawn = self._drawn
+        for point, old_stone in drawn.items():
+            stone = board.get(point)
+            if stone is not old_stone:
+                drawn[point] = stone
+                line, column = self._point_position(board, point)
+                chunks.append(_goto(line, column))
+                chunks.append(STONE_TO_CHAR[stone].strip())
+        return chunks
+
+class TiledRenderer():
+    '''
+    Draws several boards side by side (and wrapped onto more rows of tiles)
+
+    draw(boards, statuses) takes one board per tile; each tile only sends
+    the points that changed since it was last drawn.
+    '''
+    def __init__(self, num_games, board_size, tiles_per_row=3, out=None):
+        if isinstance(board_size, int):
+            board_size = (board_size, board_size)
+        num_rows, num_cols = board_size
+        self.out = out or sys.stdout
+        tile_width = 3 + 3 * num_cols + 2
+        tile_height = num_rows + 3
+        self.renderers = []
+        for index in range(num_games):
+            tile_row, tile_col = divmod(index, tiles_per_row)
+            self.renderers.append(BoardRenderer(
+                    top=1 + tile_row * tile_height,
+                    left=1 + tile_col * tile_width,
+                    out=self.out, park=False))
+        # Park the cursor below the last row of tiles after each draw
+        num_tile_rows = (num_games + tiles_per_row - 1) // tiles_per_row
+        self._bottom = 1 + num_tile_rows * tile_height
+
+    def draw(self, boards, statuses=None):
+        statuses = statuses or [''] * len(boards)
+        for renderer, board, status in zip(self.renderers, boards, statuses):
+            renderer.draw(board, status)
+        self.out.write(_goto(self._bottom, 1))
+        self.out.flush()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Wed Oct 21 13:20:57 2026
+
+@author: Ian
+"""
+
+'''
+Replay recorded games at high speed: check every move is legal and gather statistics
+
+The fast path doesn't build a GameState per move. Each game is played on a single
+Board that is changed in place:
+    - a move is tried with Board.make, and taken back with Board.unmake if it turns
+      out to be a self-capture or to repeat an earlier situation (the same ko rule
+      as GameState: situational superko)
+    - the situations seen so far are kept in one set for the whole game
+
+Games are sequences of moves: Move objects or strings like 'D4', 'pass', 'resign'
+(the format of dlgo.selfplay and dlgo.openings).
+
+replay_games spreads the games over a process pool in chunks, keeping only a few
+chunks in flight, and merges the per-chunk ReplayStats as they come back, so memory
+stays flat however many games are streamed through.
+'''
+
+import os
+from multiprocessing import Pool
+from itertools import islice
+from dlgo import goboard
+from dlgo import tables
+from dlgo.goboard import situation_key
+from dlgo.gotypes import Player
+from dlgo.utils import point_from_coords
+
+__all__ = ['ReplayStats', 'replay_game', 'replay_games']
+
+PASS = 'pass'
+RESIGN = 'resign'
+
+def _parse(item):
+    # Point for a play, or PASS / RESIGN
+    if isinstance(item, goboard.Move):
+        if item.is_pass:
+            return PASS
+        if item.is_resign:
+            return RESIGN
+        return item.point
+    text = item.strip().lower()
+    if text in (PASS, RESIGN):
+        return text
+    return point_from_coords(text.upper())
+
+class ReplayStats():
+    # How many illegal moves are kept as examples, the rest are only counted
+    MAX_EXAMPLES = 1000
+
+    def __init__(self):
+        self.games = 0
+        self.illegal_games = 0
+        self.moves = 0
+        self.passes = 0
+        self.resignations = 0
+        self.captured_stones = 0
+        # Single-stone captures that leave the capturing stone in atari: a ko was taken
+        self.ko_captures = 0
+        # game length (number of legal moves) -> number of games
+        self.lengths = {}
+        # (game id, move number, reason) of illegal moves, up to MAX_EXAMPLES
+        self.illegal_moves = []
+
+    def merge(self, other):
+        self.games += other.games
+        self.illegal_games += other.illegal_games
+        self.moves += other.moves
+        self.passes += other.passes
+        self.resignations += other.resignations
+        self.captured_stones += other.captured_stones
+        self.ko_captures += other.ko_captures
+        for length, count in other.lengths.items():
+            self.lengths[length] = self.lengths.get(length, 0) + count
+        room = self.MAX_EXAMPLES - len(self.illegal_moves)
+        self.illegal_moves.extend(other.illegal_moves[:max(room, 0)])
+        return self
+
+    @property
+    def mean_length(self):
+        return self.moves / self.games if self.games else 0.0
+
+    def __str__(self):
+        return ('%d games (%d with illegal moves), %d moves, mean length %.1f, '
+                '%d passes, %d resignations, %d stones captured, %d ko captures'
+                % (self.games, self.illegal_games, self.moves, self.mean_length,
+                   self.passes, self.resignations, self.captured_stones, self.ko_captures))
+
+def replay_game(moves, board_size=19, stats=None, game_id=None):
+    '''
+    replays one game into stats (a new ReplayStats if not given) and returns stats
+
+    The replay stops at the first illegal move, which is recorded with its reason;
+    a move that can't be parsed is recorded as an 'unreadable move'.
+    '''
+    if stats is None:
+        stats = ReplayStats()
+    if isinstance(board_size, int):
+        board_size = (board_size, board_size)
+    board = goboard.Board(*board_size)
+    neighbors = tables.neighbor_table(*board_size)
+    player = Player.black
+    seen = {situation_key(player, board.zobrist_hash())}
+    last = None
+    over = False
+    length = 0
+    reason = None
+    for item in moves:
+        try:
+            move = _parse(item)
+        except (ValueError, AttributeError):
+            # Not a move: bad coordinates ('I5', SGF 'tt') or not a string at all
+            move = None
+        if over:
+            reason = 'move after the game ended'
+        elif move is None:
+            reason = 'unreadable move'
+        elif move == PASS:
+            stats.passes += 1
+            over = last == PASS
+            # The same stones with the other player to move is a new situation
+            seen.add(situation_key(player.other, board.zobrist_hash()))
+        elif move == RESIGN:
+            stats.resignations += 1
+            over = True
+        else:
+            reason = _play(board, neighbors, player, move, seen, stats)
+        if reason is not None:
+            stats.illegal_games += 1
+            if len(stats.illegal_moves) < stats.MAX_EXAMPLES:
+                stats.illegal_moves.append((game_id, length + 1, reason))
+            break
+        length += 1
+        last = move
+        player = player.other
+    stats.games += 1
+    stats.moves += length
+    stats.lengths[length] = stats.lengths.get(length, 0) + 1
+    return stats
+
+def _play(board, neighbors, player, point, seen, stats):
+    # Plays point on board if it is legal; returns None, or why the move is illegal
+    if not board.is_on_grid(point):
+        return 'off the board'
+    if board.get(point) is not None:
+        return 'point occupied'
+    # Strings this move captures: opponent neighbours down to their last liberty
+    captured = {}
+    for neighbor in neighbors[point]:
+        string = board.get_go_string(neighbor)
+        if string is not None and string.color != player and string.num_liberties == 1:
+            captured[id(string)] = len(string.stones)
+    undo = board.make(player, point)
+    new_string = board.get_go_string(point)
+    if new_string.num_liberties == 0:
+        board.unmake(undo)
+        return 'self capture'
+    key = situation_key(player.other, board.zobrist_hash())
+    if key in seen:
+        board.unmake(undo)
+        return 'ko'
+    seen.add(key)
+    num_captured = sum(captured.values())
+    stats.captured_stones += num_captured
+    if num_captured == 1 and len(new_string.stones) == 1 and new_string.num_liberties == 1:
+        stats.ko_captures += 1
+    return None
+
+def _replay_chunk(job):
+    first_id, games, board_size = job
+    stats = ReplayStats()
+    for offset, moves in enumerate(games):
+        replay_game(moves, board_size, stats, first_id + offset)
+    return stats
+
+def _chunks(games, chunksize, board_size):
+    games = iter(games)
+    first_id = 0
+    while True:
+        chunk = list(islice(games, chunksize))
+        if not chunk:
+            return
+        yield (first_id, chunk, board_size)
+        first_id += len(chunk)
+
+def replay_games(games, board_size=19, processes=None, chunksize=256):
+    '''
+    replays a stream of games on a process pool and returns the merged ReplayStats
+
+    Game ids in illegal_moves are positions in the stream, starting at 0.
+    processes=1 replays in this process (no pool).
+    '''
+    total = ReplayStats()
+    jobs = _chunks(games, chunksize, board_size)
+    if processes == 1:
+        for job in jobs:
+            total.merge(_replay_chunk(job))
+        return total
+    processes = processes or os.cpu_count()
+    with Pool(processes) as pool:
+        # Keep a couple of chunks per worker in flight; more would just pile up in memory
+        max_in_flight = 2 * processes
+        in_flight = []
+        for job in jobs:
+            in_flight.append(pool.apply_async(_replay_chunk, (job,)))
+            if len(in_flight) >= max_in_flight:
+                total.merge(in_flight.pop(0).get())
+        for result in in_flight:
+            total.merge(result.get())
+    return total
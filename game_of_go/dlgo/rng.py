@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:17:45 2026
+
+@author: Ian
+"""
+
+'''
+Seeded random number generators for agents, self-play and playouts
+
+Nothing in dlgo should use the global random module: each agent, game and worker
+gets its own random.Random, so runs can be repeated exactly.
+
+spawn_rng(seed, *stream) derives an independent generator for one stream (say, one
+game of a batch) from the run's seed. The stream only depends on the seed and the
+stream id, not on which process or in which order it runs, so results stay the same
+whatever the number of worker processes.
+'''
+
+import hashlib
+import random
+
+__all__ = ['make_rng', 'spawn_rng', 'stream_seed']
+
+def make_rng(seed=None):
+    # seed=None seeds from the OS, like random.Random()
+    return random.Random(seed)
+
+def stream_seed(seed, *stream):
+    # Hash the seed and stream id together; hashlib gives the same answer on every
+    # platform and run (unlike hash(), which is salted per process for strings)
+    text = repr((seed,) + tuple(stream)).encode('utf-8')
+    return int.from_bytes(hashlib.sha256(text).digest()[:8], 'little')
+
+def spawn_rng(seed, *stream):
+    # Without a seed there is nothing to reproduce: seed from the OS
+    if seed is None:
+        return random.Random()
+    return random.Random(stream_seed(seed, *stream))
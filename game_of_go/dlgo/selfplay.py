@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 11:52:09 2026
+
+@author: Ian
+"""
+
+'''
+Reproducible self-play
+
+Game number i of a run always uses the random streams spawn_rng(seed, i, 'black')
+and spawn_rng(seed, i, 'white'), whichever worker process plays it. A run with the
+same seed gives the same games, bit for bit, with 1 process or 64.
+
+Games come back as lists of move strings ('D4', 'pass', 'resign'), the format
+dlgo.openings reads.
+'''
+
+from multiprocessing import Pool
+from dlgo import agent
+from dlgo import goboard
+from dlgo.gotypes import Player
+from dlgo.rng import spawn_rng
+from dlgo.utils import coords_from_point
+
+__all__ = ['play_game', 'self_play']
+
+def _move_to_str(move):
+    if move.is_pass:
+        return 'pass'
+    if move.is_resign:
+        return 'resign'
+    return coords_from_point(move.point)
+
+def play_game(seed, game_index, board_size=19, max_moves=None, bot_class=agent.RandomBot):
+    '''
+    plays one game between two bots seeded from (seed, game_index) and returns its moves
+    '''
+    game = goboard.GameState.new_game(board_size)
+    bots = {
+            Player.black: bot_class(rng=spawn_rng(seed, game_index, 'black')),
+            Player.white: bot_class(rng=spawn_rng(seed, game_index, 'white')),
+    }
+    moves = []
+    while not game.is_over() and (max_moves is None or len(moves) < max_moves):
+        move = bots[game.next_player].select_move(game)
+        moves.append(_move_to_str(move))
+        game = game.apply_move(move)
+    return moves
+
+def _play_game_job(job):
+    return play_game(*job)
+
+def self_play(num_games, seed, board_size=19, max_moves=None, processes=1,
+              bot_class=agent.RandomBot):
+    # Returns the games in order of game number, however many processes played them
+    jobs = [(seed, index, board_size, max_moves, bot_class) for index in range(num_games)]
+    if processes == 1:
+        return [_play_game_job(job) for job in jobs]
+    with Pool(processes) as pool:
+        return pool.map(_play_game_job, jobs, chunksize=max(1, num_games // (4 * processes)))
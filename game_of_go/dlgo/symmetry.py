@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 15:08:33 2026
+
+@author: Ian
+"""
+
+'''
+Symmetry-aware canonical hashing on top of dlgo.zobrist
+
+A square Go board looks the same under 8 symmetries (4 rotations, each optionally
+mirrored), so the same position can show up with 8 different zobrist hashes.
+
+Exactly how this works:
+    - lane k of a position is the zobrist hash of the position transformed by symmetry k
+    - all 8 lanes are packed side by side, 64 bits each, into one Python int
+    - XOR works lane by lane on the packed int, so placing or removing a stone
+      updates all 8 hashes with a single XOR, just like the plain zobrist hash
+    - the canonical hash is the smallest lane, and its index tells which symmetry
+      maps the position onto its canonical form
+
+Rectangular boards only have the 4 symmetries that keep rows as rows (0, 2, 4, 5).
+'''
+
+from dlgo import tables
+from dlgo.gotypes import Player, Point
+
+__all__ = ['NUM_SYMMETRIES', 'transform_point', 'inverse', 'symmetries_for',
+           'symmetry_codes', 'empty_board_code', 'lane', 'canonical']
+
+NUM_SYMMETRIES = 8
+LANE_BITS = 64
+LANE_MASK = (1 << LANE_BITS) - 1
+
+# Symmetry k maps (row, col) on a board of num_rows x num_cols to:
+#   0: identity             1: rotate 90
+#   2: rotate 180           3: rotate 270
+#   4: mirror top/bottom    5: mirror left/right
+#   6: transpose            7: anti-transpose
+def transform_point(point, k, num_rows, num_cols):
+    row, col = point
+    if k == 0:
+        return point
+    if k == 1:
+        return Point(col, num_rows + 1 - row)
+    if k == 2:
+        return Point(num_rows + 1 - row, num_cols + 1 - col)
+    if k == 3:
+        return Point(num_cols + 1 - col, row)
+    if k == 4:
+        return Point(num_rows + 1 - row, col)
+    if k == 5:
+        return Point(row, num_cols + 1 - col)
+    if k == 6:
+        return Point(col, row)
+    return Point(num_cols + 1 - col, num_rows + 1 - row)
+
+# Rotating by 90 and by 270 undo each other, every other symmetry is its own inverse
+_INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+def inverse(k):
+    return _INVERSE[k]
+
+def symmetries_for(num_rows, num_cols):
+    if num_rows == num_cols:
+        return tuple(range(NUM_SYMMETRIES))
+    return (0, 2, 4, 5)
+
+def _pack(codes):
+    packed = 0
+    for k, code in enumerate(codes):
+        packed |= code << (k * LANE_BITS)
+    return packed
+
+def empty_board_code():
+    return _pack([tables.empty_board_hash()] * NUM_SYMMETRIES)
+
+_tables = {}
+
+def symmetry_codes(num_rows, num_cols):
+    '''
+    returns {(point, player): packed codes} for a board size, built once per size
+
+    Lanes of symmetries the board doesn't have stay 0.
+    '''
+    size = (num_rows, num_cols)
+    table = _tables.get(size)
+    if table is None:
+        table = {}
+        codes_by_point = tables.hash_table(num_rows, num_cols)
+        valid = symmetries_for(num_rows, num_cols)
+        for row in range(1, num_rows + 1):
+            for col in range(1, num_cols + 1):
+                point = Point(row, col)
+                for player in (Player.black, Player.white):
+                    codes = [0] * NUM_SYMMETRIES
+                    for k in valid:
+                        image = transform_point(point, k, num_rows, num_cols)
+                        codes[k] = codes_by_point[image, player]
+                    table[point, player] = _pack(codes)
+        _tables[size] = table
+    return table
+
+def lane(packed, k):
+    # The zobrist hash of the position transformed by symmetry k
+    return (packed >> (k * LANE_BITS)) & LANE_MASK
+
+def canonical(packed, num_rows, num_cols):
+    '''
+    returns (canonical hash, k) where k is the symmetry that takes the position
+    to its canonical form; a move m in the canonical frame is
+    transform_point(m, inverse(k), ...) on the real board
+    '''
+    return min((lane(packed, k), k) for k in symmetries_for(num_rows, num_cols))
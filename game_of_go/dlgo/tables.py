@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 14:06:38 2026
+
+@author: Ian
+"""
+
+'''
+Lookup tables that depend on the board size, built once per size and cached
+
+    - neighbor_table: point -> its on-board neighbours, so the board engine never
+      has to check is_on_grid in its inner loops
+    - hash_table: (point, player) -> zobrist code for every point of the board
+
+dlgo.zobrist only has codes for 19 x 19. The same codes are used wherever a board
+has those points (so hashes of 19 x 19 positions don't change), and the points
+beyond get codes derived from their coordinates with dlgo.rng.stream_seed, which
+are the same on every run. Boards can be any size, rectangular or bigger than 25 x 25.
+
+The generated dlgo.zobrist module is large, so it is only imported when the first
+hash table is built, not when dlgo.goboard is imported.
+'''
+
+from dlgo.gotypes import Player, Point
+from dlgo.rng import stream_seed
+
+__all__ = ['neighbor_table', 'hash_table', 'hash_code', 'empty_board_hash']
+
+MAX63 = 0x7fffffffffffffff
+
+_neighbor_tables = {}
+_hash_tables = {}
+
+def neighbor_table(num_rows, num_cols):
+    size = (num_rows, num_cols)
+    table = _neighbor_tables.get(size)
+    if table is None:
+        table = {}
+        for row in range(1, num_rows + 1):
+            for col in range(1, num_cols + 1):
+                point = Point(row, col)
+                table[point] = tuple(
+                    neighbor for neighbor in point.neighbors()
+                    if 1 <= neighbor.row <= num_rows and 1 <= neighbor.col <= num_cols)
+        _neighbor_tables[size] = table
+    return table
+
+def empty_board_hash():
+    from dlgo import zobrist
+    return zobrist.EMPTY_BOARD
+
+def hash_code(point, player):
+    from dlgo import zobrist
+    code = zobrist.HASH_CODE.get((point, player))
+    if code is None:
+        code = stream_seed('zobrist', point.row, point.col, player.value) & MAX63
+    return code
+
+def hash_table(num_rows, num_cols):
+    size = (num_rows, num_cols)
+    table = _hash_tables.get(size)
+    if table is None:
+        table = {}
+        for row in range(1, num_rows + 1):
+            for col in range(1, num_cols + 1):
+                point = Point(row, col)
+                for player in (Player.black, Player.white):
+                    table[point, player] = hash_code(point, player)
+        _hash_tables[size] = table
+    return table
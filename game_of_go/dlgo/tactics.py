@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 20 09:31:12 2026
+
+@author: Ian
+"""
+
+'''
+Cheap tactical reading on a dlgo.goboard.Board, for rollout and search policies
+
+    - atari: a string with a single liberty, it can be captured on the next move
+    - ladder: the attacker keeps the string in atari every move until it runs
+      into the edge or friendly stones and gets captured
+
+Ladders are read with Board.make / Board.unmake on the board that is passed in,
+so nothing is copied; the board is left exactly as it was found.
+
+The reader works at the board level: it rejects self-capture but doesn't know
+about the ko history, so moves it suggests still go through GameState.is_valid_move.
+'''
+
+__all__ = ['strings_in_atari', 'capture_moves', 'is_ladder_captured', 'escape_moves',
+           'tactical_moves']
+
+# How many attacker moves a ladder is read for before giving up (and calling it an escape)
+MAX_LADDER_DEPTH = 40
+
+def _strings(board, color=None):
+    # Each string once, even though the grid maps every one of its stones to it
+    seen = set()
+    for string in board._grid.values():
+        if string is None or id(string) in seen:
+            continue
+        seen.add(id(string))
+        if color is None or string.color == color:
+            yield string
+
+def strings_in_atari(board, color=None):
+    return [string for string in _strings(board, color) if string.num_liberties == 1]
+
+def capture_moves(board, player):
+    '''
+    returns the points where player captures stones right away, biggest capture first
+    '''
+    captures = {}
+    for string in strings_in_atari(board, player.other):
+        point, = string.liberties
+        captures[point] = captures.get(point, 0) + len(string.stones)
+    return sorted(captures, key=lambda point: -captures[point])
+
+def _is_self_capture(board, point):
+    return board.get_go_string(point).num_liberties == 0
+
+def _defender_moves(board, string):
+    # Extend at the last liberty, or capture an attacking string that is itself in atari
+    moves = set(string.liberties)
+    for stone in string.stones:
+        for neighbor in stone.neighbors():
+            neighbor_string = board.get_go_string(neighbor)
+            if neighbor_string is not None and neighbor_string.color != string.color \
+                    and neighbor_string.num_liberties == 1:
+                moves |= neighbor_string.liberties
+    return moves
+
+def _defender_loses(board, prey_point, depth):
+    # The string at prey_point is in atari and its owner is to move
+    prey = board.get_go_string(prey_point)
+    for move in _defender_moves(board, prey):
+        undo = board.make(prey.color, move)
+        liberties = board.get_go_string(prey_point).num_liberties
+        escaped = liberties >= 3 or \
+            (liberties == 2 and (depth <= 0 or not _attacker_wins(board, prey_point, depth)))
+        board.unmake(undo)
+        if escaped:
+            return False
+    return True
+
+def _attacker_wins(board, prey_point, depth):
+    # The string at prey_point has two liberties and the attacker is to move
+    prey = board.get_go_string(prey_point)
+    attacker = prey.color.other
+    for move in prey.liberties:
+        undo = board.make(attacker, move)
+        captured = not _is_self_capture(board, move) and \
+            board.get_go_string(prey_point).num_liberties == 1 and \
+            _defender_loses(board, prey_point, depth - 1)
+        board.unmake(undo)
+        if captured:
+            return True
+    return False
+
+def is_ladder_captured(board, point, max_depth=MAX_LADDER_DEPTH):
+    '''
+    True if the string at point, in atari with its owner to move, can't be saved:
+    every way out (extending or capturing an attacker) ends in capture
+
+    Reads at most max_depth attacker moves; a ladder longer than that counts as an escape.
+    '''
+    string = board.get_go_string(point)
+    assert string is not None and string.num_liberties == 1
+    return _defender_loses(board, point, max_depth)
+
+def escape_moves(board, player, max_depth=MAX_LADDER_DEPTH):
+    '''
+    returns the points that save one of player's strings in atari:
+    extensions that end up with enough liberties (and don't run into a working
+    ladder) and captures of attacking strings
+    '''
+    escapes = []
+    for string in strings_in_atari(board, player):
+        prey_point = next(iter(string.stones))
+        for move in _defender_moves(board, string):
+            if move in escapes:
+                continue
+            undo = board.make(player, move)
+            liberties = board.get_go_string(prey_point).num_liberties
+            saved = liberties >= 3 or \
+                (liberties == 2 and not _attacker_wins(board, prey_point, max_depth))
+            board.unmake(undo)
+            if saved:
+                escapes.append(move)
+    return escapes
+
+def tactical_moves(board, player, max_depth=MAX_LADDER_DEPTH):
+    '''
+    the cheap query for policies: urgent points for player, best first
+
+    Captures come first (biggest first), then moves that save strings in atari.
+    An empty list means there is nothing urgent and the policy can play as usual.
+    '''
+    moves = capture_moves(board, player)
+    for move in escape_moves(board, player, max_depth):
+        if move not in moves:
+            moves.append(move)
+    return moves
@@ -7,39 +7,67 @@ Created on Thu Jan  2 15:54:24 2020
 """
 from dlgo import gotypes
 
-COLS = 'ABCDEFGHJKLMNOPQRST'
+# Column letters skip I (it looks too much like J); boards wider than 25 columns
+# continue with two letters: AA, AB, ... (see column_label)
+COLS = 'ABCDEFGHJKLMNOPQRSTUVWXYZ'
 STONE_TO_CHAR = {
         None: ' . ',
         gotypes.Player.black: ' x ',
         gotypes.Player.white: ' o ', 
 }
 
-def print_move(player, move):
+def format_move(player, move):
     if move.is_pass:
         move_str = 'passes'
     elif move.is_resign:
         move_str = 'resigns'
     else:
-        move_str = '%s%d' % (COLS[move.point.col - 1], move.point.row)
-    print('%s %s' % (player, move_str))
+        move_str = coords_from_point(move.point)
+    return '%s %s' % (player, move_str)
+
+def print_move(player, move):
+    print(format_move(player, move))
+
+def column_label(col):
+    # 1 -> A, ..., 25 -> Z, 26 -> AA, 27 -> AB, ...
+    label = ''
+    while col > 0:
+        col, index = divmod(col - 1, len(COLS))
+        label = COLS[index] + label
+    return label
+
+def column_index(label):
+    # The other way around: A -> 1, AA -> 26
+    col = 0
+    for letter in label:
+        col = col * len(COLS) + COLS.index(letter) + 1
+    return col
+
+def column_header(num_cols):
+    # Each label sits in a 3 character cell, centred over the points of print_board
+    return ('   ' + ''.join(column_label(col).center(3)
+                            for col in range(1, num_cols + 1))).rstrip()
 
 def print_board(board):
     for row in range(board.num_rows, 0, -1):
-        # row number 10, 11, 12 have 2 digits, fix mis-alignment by adding two spaces
-        bump = " " if row <= 9 else ""
+        # row number 10, 11, 12 have 2 digits, fix mis-alignment by padding to 2 characters
         line = []
         for col in range(1, board.num_cols + 1):
             stone = board.get(gotypes.Point(row=row, col=col))
             line.append(STONE_TO_CHAR[stone])
-        print('%s%d %s' % (bump, row, ''.join(line)))
+        print('%2d %s' % (row, ''.join(line)))
     # The spaces align the lettered columns with the points on board
-    print('    ' + '  '.join(COLS[:board.num_cols]))
+    print(column_header(board.num_cols))
 
 # Play against your own bot!
 def point_from_coords(coords):
-    # Convert human input (say, A8) into coordinates on Go board
-    col = COLS.index(coords[0]) + 1
-    # Cast the row number (1 - 19, hence [1:] as input can be 3-character-long) into int
-    row = int(coords[1:])
+    # Convert human input (say, A8 or AB12) into coordinates on Go board
+    letters = coords.rstrip('0123456789')
+    col = column_index(letters)
+    # Cast the row number (the digits after the letters) into int
+    row = int(coords[len(letters):])
     return gotypes.Point(row=row, col=col)
-    
\ No newline at end of file
+
+def coords_from_point(point):
+    # The other way around: Point(row=8, col=1) becomes 'A8'
+    return '%s%d' % (column_label(point.col), point.row)
@@ -0,0 +1,119 @@
+"""
+Optimal basic strategy for Modern Blackjack
+"""
+
+'''
+The best hit / stand / doubledown decision for every (player total, soft flag, dealer
+upcard), under the rules of play_hand (doubling down on any turn, 2.5x blackjacks,
+dealer stands on all 17s), for an infinite deck.
+
+When the player's turn starts the dealer is known not to have a blackjack (play_hand
+settles blackjacks first), so the hole card is drawn from the deck without the
+card that would complete one. For each state the solver compares:
+
+    - stand: the dealer's final total distribution against the player's total
+    - doubledown: twice the bet on one more card, then stand
+    - hit: one more card, then the best decision of the new state
+
+and keeps the action with the highest expected return. States are solved once each,
+memoized; a hit always adds to the hard total, so the recursion ends.
+
+The result is a DecisionTable: it plays like any strategy function in
+play_player_turn, run_simulation, the vectorized engine and expected_value.
+
+    python basic_strategy.py      (prints the chart and the edge)
+'''
+
+from blackjack import BlackJackHand, DecisionTable
+from dealer_outcomes import CARD_VALUES, draws, shoe_counts, stand_value, upcard_distribution
+from expected_value import strategy_ev
+
+#one-letter chart names of the actions
+CHART_NAMES = {DecisionTable.STAND: 'S', DecisionTable.HIT: 'H', DecisionTable.DOUBLE: 'D'}
+
+def solve():
+    """
+    Solves basic strategy for an infinite deck.
+
+    Returns:
+    tuple (DecisionTable, dict):
+        - the optimal strategy; the hole card dimension of the table is not used
+        - (total, soft, upcard) -> {action: expected net return per unit bet}
+    """
+    counts = shoe_counts()
+    cards = draws(counts, infinite=True)
+    values = {}
+
+    def best(total, soft, upcard):
+        #(expected return, action) of the best decision in a state
+        if total > 21:
+            return (-1.0, DecisionTable.STAND)
+        key = (total, soft > 0, upcard)
+        if key not in values:
+            distribution = upcard_distribution(upcard, counts, infinite=True)
+            stand = stand_value(total, distribution)
+            hit = 0.0
+            double = 0.0
+            for card, probability, _ in cards:
+                next_total, next_soft = BlackJackHand.add_card(total, soft, card)
+                hit += probability * best(next_total, next_soft, upcard)[0]
+                if next_total > 21:
+                    double -= 2 * probability
+                else:
+                    double += 2 * probability * stand_value(next_total, distribution)
+            values[key] = {DecisionTable.STAND: stand, DecisionTable.HIT: hit,
+                           DecisionTable.DOUBLE: double}
+        action_values = values[key]
+        action = max(action_values, key=action_values.get)
+        return (action_values[action], action)
+
+    actions = [[[[DecisionTable.STAND] * 12 for _ in range(12)] for _ in range(2)]
+               for _ in range(22)]
+    for total in range(4, 22):
+        for soft in (0, 1):
+            if soft and total < 12:
+                continue
+            for upcard in CARD_VALUES:
+                action = best(total, soft, upcard)[1]
+                for hole in CARD_VALUES:
+                    actions[total][soft][upcard][hole] = action
+    return DecisionTable(actions, 'basic_strategy'), values
+
+_solved = None
+
+def basic_strategy():
+    """
+    Returns:
+    DecisionTable, the optimal strategy (solved on first use)
+    """
+    global _solved
+    if _solved is None:
+        _solved = solve()[0]
+    return _solved
+
+def edge(num_decks=None):
+    """
+    Returns the player's edge with basic strategy: the expected net return per unit of
+    initial bet (positive means the player wins in the long run), as computed by
+    expected_value.strategy_ev for an infinite deck or a fresh shoe of num_decks decks.
+    """
+    return strategy_ev(basic_strategy(), num_decks)[0]
+
+def chart(table=None):
+    """
+    Returns the strategy as a text chart: a row per hand, a column per dealer upcard.
+    """
+    table = table or basic_strategy()
+    upcards = CARD_VALUES
+    lines = ['       ' + ' '.join('%2s' % ('A' if card == 11 else card) for card in upcards)]
+    rows = [('hard', total, 0) for total in range(5, 22)] + \
+           [('soft', total, 1) for total in range(12, 22)]
+    for kind, total, soft in rows:
+        names = [CHART_NAMES[table.lookup(total, soft, upcard, 2)] for upcard in upcards]
+        lines.append('%s %2d ' % (kind, total) + ' '.join('%2s' % name for name in names))
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    print(chart())
+    print('Edge, infinite deck: %.3f%%' % (100 * edge()))
+    print('Edge, 8 decks: %.3f%%' % (100 * edge(8)))
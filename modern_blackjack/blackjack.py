@@ -9,7 +9,8 @@ import random
 import matplotlib.pyplot as plt
 import scipy.stats as stats
 import numpy as np
-from helper import BlackJackCard, CardDecks, Busted
+from helper import BlackJackCard, CardDecks, Shoe, Busted
+from running_stats import RunningStats
 
 '''
 Modern Blackjack - a simplfied game
@@ -136,6 +137,33 @@ class BlackJackHand:
             aces-=1 
         return total 
               
+    @staticmethod
+    def hand_state(cards):
+        """
+        Returns:
+        tuple (int, int): the best value of the cards, and the number of aces
+        in it that still count as 11 (the hand is soft if there is one)
+        """
+        total = 0
+        soft = 0
+        for card in cards:
+            total, soft = BlackJackHand.add_card(total, soft, card.get_val())
+        return total, soft
+
+    @staticmethod
+    def add_card(total, soft, value):
+        """
+        Returns hand_state after adding a card of the given value to a hand
+        of state (total, soft).
+        """
+        total += value
+        if value == 11:
+            soft += 1
+        while total > 21 and soft:
+            total -= 10
+            soft -= 1
+        return total, soft
+
     def get_player_cards(self):
         """
         Returns:
@@ -261,28 +289,60 @@ class BlackJackHand:
             - Whenever hitting, we signal to the caller if the best value of the 
               player's hand becomes greater than 21 (because the player has busted).
 
+        NOTE:
+            - A DecisionTable (see compile_strategy) is played on a fast path: the hand's
+              total is kept up to date card by card and each decision is one table lookup.
+
         Parameter:
         strategy - function, one of the the 4 playing strategies defined in BlackJackHand
-                   (e.g. BlackJackHand.mimic_dealer_strategy, BlackJackHand.double_down_strategy)
+                   (e.g. BlackJackHand.mimic_dealer_strategy, BlackJackHand.double_down_strategy),
+                   or a DecisionTable
 
         Returns:          
         Nothing 
         """
-        while strategy(self) != 'stand':
+        if isinstance(strategy, DecisionTable):
+            self._play_table(strategy)
+            return
+        #the strategy is asked once per step
+        action = strategy(self)
+        while action != 'stand':
             #CASE 1: Double down
-            if strategy(self) == BlackJackHand.doubledown:
+            if action == BlackJackHand.doubledown:
                 self.set_bet(self.get_bet()*2)
                 self.player.append(self.deck.deal_card())
                 #Check busted first 
                 break
             #CASE 2: Normal hit
-            if strategy(self) == 'hit':
-                self.player.append(self.deck.deal_card())
+            if action != 'hit':
+                raise ValueError('Unknown action ' + repr(action))
+            self.player.append(self.deck.deal_card())
+            action = strategy(self)
         #busted
         if self.best_value(self.player) > 21: 
             raise Busted
         #CASE 3: Stand
 
+    def _play_table(self, table):
+        """
+        play_player_turn for a DecisionTable.
+        """
+        total, soft = BlackJackHand.hand_state(self.player)
+        upcard = self.dealer[0].get_val()
+        hole = self.dealer[1].get_val()
+        while total <= 21:
+            action = table.lookup(total, soft, upcard, hole)
+            if action == DecisionTable.STAND:
+                break
+            card = self.deck.deal_card()
+            self.player.append(card)
+            total, soft = BlackJackHand.add_card(total, soft, card.get_val())
+            if action == DecisionTable.DOUBLE:
+                self.set_bet(self.get_bet()*2)
+                break
+        if total > 21:
+            raise Busted
+
     def play_dealer_turn(self):
         """
         Plays a full round of the dealer's turn and updates the dealer's hand
@@ -319,6 +379,127 @@ class BlackJackHand:
             result += str(c) + ','
         return result[:-1]
 
+class DecisionTable:
+    """
+    A playing strategy compiled into a lookup table (see compile_strategy).
+
+    The table holds the strategy's action for every state of the player's turn:
+    (best value of the player's hand, soft flag, dealer upcard value, dealer hole card value).
+    A DecisionTable can be used wherever a strategy function is expected.
+    """
+    #actions, as stored in the table
+    STAND = 0
+    HIT = 1
+    DOUBLE = 2
+    ACTIONS = (BlackJackHand.stand, BlackJackHand.hit, BlackJackHand.doubledown)
+
+    #table dimensions: totals 0-21, soft or not, card values 0-11
+    SHAPE = (22, 2, 12, 12)
+
+    def __init__(self, actions, name='decision_table'):
+        """
+        Parameters:
+        actions - numpy array of shape SHAPE holding STAND, HIT or DOUBLE
+        name - str, the name of the strategy (used in plot titles)
+        """
+        self.array = np.asarray(actions, dtype=np.int8).reshape(DecisionTable.SHAPE)
+        #flat copy for fast lookups of single states
+        self._actions = self.array.ravel().tolist()
+        self.__name__ = name
+
+    def lookup(self, total, soft, upcard, hole):
+        """
+        Returns the action (STAND, HIT or DOUBLE) for a state; soft is 0 or more.
+        """
+        if total > 21:
+            return DecisionTable.STAND
+        return self._actions[((total * 2 + (soft > 0)) * 12 + upcard) * 12 + hole]
+
+    def __call__(self, hand):
+        """
+        Returns the action for a BlackJackHand, as a string like the strategy functions.
+        """
+        total, soft = BlackJackHand.hand_state(hand.player)
+        upcard = hand.dealer[0].get_val()
+        hole = hand.dealer[1].get_val()
+        return DecisionTable.ACTIONS[self.lookup(total, soft, upcard, hole)]
+
+def _card(value):
+    #a card with the given value (11 is an ace)
+    if value == 11:
+        return BlackJackCard('A', 'S')
+    return BlackJackCard(str(value), 'S')
+
+def _player_cards(total, soft):
+    #cards adding up to a given best value: an ace and one card if soft,
+    #otherwise two cards (three for a hard 21) without aces
+    if soft:
+        return [_card(11), _card(11 if total == 12 else total - 11)]
+    if total <= 20:
+        first = max(2, total - 10)
+        return [_card(first), _card(total - first)]
+    return [_card(10), _card(9), _card(2)]
+
+#strategy function -> DecisionTable
+_compiled = {}
+
+#strategies that only look at what compile_strategy enumerates, compiled by default
+BUILTIN_STRATEGIES = (BlackJackHand.mimic_dealer_strategy, BlackJackHand.peek_strategy,
+                      BlackJackHand.simple_strategy, BlackJackHand.doubledown_strategy)
+
+def compiled_by_default(strategy):
+    """
+    Returns True if run_simulation compiles strategy when compiled is None: for the
+    BUILTIN_STRATEGIES and DecisionTables. Compiling any other strategy could change
+    how it plays, so it is opt-in.
+    """
+    return isinstance(strategy, DecisionTable) or strategy in BUILTIN_STRATEGIES
+
+def compile_strategy(strategy):
+    """
+    Compiles a playing strategy into a DecisionTable, once per strategy.
+
+    The strategy is called on a made-up hand for every state of the player's turn,
+    so it must only depend on the best value and softness of the player's hand and
+    on the dealer's two cards (the four strategies of BlackJackHand do). A strategy
+    that looks at anything else (the deck, the bet, the number of cards) either
+    raises ValueError here or is compiled into a table that plays differently.
+
+    Parameters:
+    strategy - function, a playing strategy taking a BlackJackHand, or a DecisionTable
+
+    Returns:
+    DecisionTable
+    """
+    if isinstance(strategy, DecisionTable):
+        return strategy
+    table = _compiled.get(strategy)
+    if table is not None:
+        return table
+    codes = {action: code for code, action in enumerate(DecisionTable.ACTIONS)}
+    actions = np.zeros(DecisionTable.SHAPE, dtype=np.int8)
+    hand = BlackJackHand.__new__(BlackJackHand)
+    hand.deck = None
+    hand.current_bet = 1.0
+    for total in range(4, 22):
+        for soft in (0, 1):
+            if soft and total < 12:
+                continue
+            player = _player_cards(total, soft)
+            for upcard in range(2, 12):
+                for hole in range(2, 12):
+                    hand.set_initial_cards(player, [_card(upcard), _card(hole)])
+                    try:
+                        action = strategy(hand)
+                    except (AttributeError, TypeError) as error:
+                        #the made-up hand has no deck: the strategy needs more than a state
+                        raise ValueError(strategy.__name__ + ' cannot be compiled: ' + str(error))
+                    if action not in codes:
+                        raise ValueError('Unknown action ' + repr(action))
+                    actions[total, soft, upcard, hole] = codes[action]
+    table = _compiled[strategy] = DecisionTable(actions, strategy.__name__)
+    return table
+
 def play_hand(deck, strategy, initial_bet=1.0):
     """
     Plays a hand of Blackjack and determines the amount of money the player
@@ -351,7 +532,7 @@ def play_hand(deck, strategy, initial_bet=1.0):
                amount_won, the amount of money the player gets back. Should be 0 if they busted and lost.
     """
     #First, deal cards to player, then dealer
-    game = BlackJackHand(deck)
+    game = BlackJackHand(deck, initial_bet)
     #Then, check initial blackjacks
     if game.best_value(game.get_player_cards())==21:
         #CASE 1: both win initially  (1x)
@@ -367,13 +548,13 @@ def play_hand(deck, strategy, initial_bet=1.0):
     try:
         #keep hitting until stand
         game.play_player_turn(strategy)
-    except:
+    except Busted:
         #busted
         return (game.get_bet(), 0)
     #Now, dealer plays
     try:
         game.play_dealer_turn()
-    except:
+    except Busted:
         #player wins 2x
         return (game.get_bet(), 2*game.get_bet())
     
@@ -387,7 +568,9 @@ def play_hand(deck, strategy, initial_bet=1.0):
     else:
         return (game.get_bet(), 0)
 
-def run_simulation(strategy, initial_bet=2.0, num_decks=8, num_hands=20, num_trials=100, show_plot=False):
+def run_simulation(strategy, initial_bet=2.0, num_decks=8, num_hands=20, num_trials=100, show_plot=False,
+                   vectorized=False, seed=None, target_half_width=None, confidence=0.95, compiled=None,
+                   penetration=None):
     """
     Runs a simulation
     Generates a Gaussian distribution that shows player's rate of return across all trials
@@ -403,6 +586,24 @@ def run_simulation(strategy, initial_bet=2.0, num_decks=8, num_hands=20, num_tri
         num_hands - int, the number of hands the player plays in each trial. (default=20)
         num_trials - int, the total number of trials in the simulation. (default=100)
         show_plot - bool, True if the plot should be displayed, False otherwise. (default=False)
+        vectorized - bool, True to play all trials on NumPy arrays (see vectorized.py),
+                     much faster for large num_trials; the strategy is always compiled.
+                     (default=False)
+        seed - int, seed of the random generator. (default=None)
+        target_half_width - float, stop as soon as the confidence interval of the mean rate
+                            of return is narrower than +/- target_half_width (in %);
+                            num_trials is then the maximum number of trials. (default=None)
+        confidence - float, confidence level of that interval. (default=0.95)
+        compiled - bool, play the strategy compiled into a DecisionTable (see compile_strategy).
+                   None compiles only the four strategies of BlackJackHand and DecisionTables;
+                   set to True for other strategies that only look at what compile_strategy
+                   enumerates. (default=None)
+        penetration - float, play all trials on one continuous Shoe with the cut card after
+                      this fraction of the shoe, instead of a fresh deck per trial;
+                      not available with vectorized. (default=None)
+
+    Trials are played in blocks and summarized on the fly (running_stats.RunningStats),
+    so the precision is checked after every block.
 
     Returns:
 
@@ -411,32 +612,132 @@ def run_simulation(strategy, initial_bet=2.0, num_decks=8, num_hands=20, num_tri
             - float, the average rate of return across all the trials
             - float, the standard deviation of rates of return across all trials    
     """
+    if vectorized and penetration is not None:
+        raise ValueError('The vectorized engine deals a fresh shoe per trial, penetration needs vectorized=False')
+    if compiled is None:
+        compiled = compiled_by_default(strategy)
+    if vectorized and not compiled:
+        raise ValueError('The vectorized engine only plays compiled strategies, vectorized needs compiled=True')
+    if compiled:
+        strategy = compile_strategy(strategy)
+    rates = []
+    summary = RunningStats()
+    for block in _rate_blocks(strategy, initial_bet, num_decks, num_hands, num_trials, vectorized, seed,
+                              penetration):
+        rates.extend(block)
+        summary.add_many(block)
+        #stop when precise enough
+        if target_half_width is not None and summary.half_width(confidence) <= target_half_width:
+            break
+    
+    if show_plot:
+        low, high = summary.confidence_interval(confidence)
+        sorted_rates = sorted(rates)
+        probability = stats.norm.pdf(sorted_rates, summary.mean, summary.std)
+        plt.plot(sorted_rates, probability)
+        plt.hist(sorted_rates, density=True)
+        plt.title('Player ROI on Playing ' + str(num_hands) + ' Hands ' + '(' + strategy.__name__ + ')' + \
+                  '\n' + '(Mean =' + str(summary.mean) + '%,'  + ' SD = ' + str(summary.std)+ '%' + \
+                  ', ' + str(int(100*confidence)) + '% CI = [' + '%.3f, %.3f' % (low, high) + ']%)')
+        plt.xlabel('% return')
+        plt.show()
+        
+    return (rates, summary.mean, summary.std)
+
+def _rate_blocks(strategy, initial_bet, num_decks, num_hands, num_trials, vectorized, seed,
+                 penetration=None):
+    """
+    Yields the rates of return of num_trials trials, a block of trials at a time.
+    """
+    shoe = None
+    if vectorized:
+        from vectorized import simulate_rates, DEFAULT_BATCH_SIZE
+        block_size = DEFAULT_BATCH_SIZE
+        #one generator for all the blocks
+        rng = np.random.default_rng(seed)
+    else:
+        block_size = 100
+        rng = None if seed is None else random.Random(seed)
+        if penetration is not None:
+            shoe = Shoe(num_decks, BlackJackCard, penetration, rng)
+    for start in range(0, num_trials, block_size):
+        trials = min(block_size, num_trials - start)
+        if vectorized:
+            yield simulate_rates(strategy, initial_bet, num_decks, num_hands, trials, rng).tolist()
+        else:
+            yield _simulate_rates(strategy, initial_bet, num_decks, num_hands, trials, rng, shoe)
+
+def _simulate_rates(strategy, initial_bet, num_decks, num_hands, num_trials, rng=None, shoe=None):
+    """
+    Plays the trials of run_simulation one hand at a time.
+    rng - random.Random to shuffle with, the random module if None
+    shoe - Shoe to keep dealing from (reshuffled at its cut card only), or None
+           for a freshly shuffled deck per trial
+
+    Returns:
+        list of the player's rate of return for each trial
+    """
     rates = []
+    #one deck for the whole simulation, reshuffled for every trial
+    deck = shoe or CardDecks(num_decks, BlackJackCard, rng)
     for trial in range(num_trials):
-        deck = CardDecks(num_decks, BlackJackCard)
+        if trial and shoe is None:
+            deck.shuffle()
         gain = 0
         bet = 0
         #multiple hands in a trial
         #a hand can use multiple decks
         for hand in range(num_hands):
+            if shoe is not None:
+                shoe.start_hand()
             #record gain in a subgame, taking the second element (amount_gained)
             result = play_hand(deck, strategy, initial_bet)
             bet+=result[0]
             gain+=result[1]
         trial_rate = 100*(gain-bet)/(bet)
         rates.append(trial_rate)
-    
-    if show_plot:
-        probability = stats.norm.pdf(sorted(rates), np.mean(rates), np.std(rates))
-        plt.plot(sorted(rates), probability)
-        plt.hist(sorted(rates), density=True)
-        plt.title('Player ROI on Playing ' + str(num_hands) + ' Hands ' + '(' + strategy.__name__ + ')' + \
-                  '\n' + '(Mean =' + str(np.mean(rates)) + '%,'  + ' SD = ' + str(np.std(rates))+ '%' +')')
-        plt.xlabel('% return')
-        plt.show()
-        
-    return (rates, np.mean(rates), np.std(rates))
+    return rates
         
+def run_session(strategy, num_hands, initial_bet=1.0, num_decks=8, penetration=0.75, seed=None,
+                compiled=None):
+    """
+    Plays one long session of num_hands hands on a single continuous Shoe, reshuffled
+    in place whenever the cut card comes out. Results are summarized hand by hand, so
+    memory stays the same for any number of hands.
+
+    Parameters:
+        strategy - function, a playing strategy of BlackJackHand, or a DecisionTable
+        num_hands - int, the number of hands in the session
+        initial_bet - float, the bet of each hand. (default=1)
+        num_decks - int, the number of decks in the shoe. (default=8)
+        penetration - float, the fraction of the shoe dealt before reshuffling. (default=0.75)
+        seed - int, seed of the shuffles. (default=None)
+        compiled - bool, as in run_simulation. (default=None)
+
+    Returns:
+
+        tuple:
+            - RunningStats of the net return of each hand, in % of initial_bet
+            - float, the rate of return of the session (%): net return over amount wagered
+            - int, the number of times the shoe was reshuffled
+    """
+    if compiled is None:
+        compiled = compiled_by_default(strategy)
+    if compiled:
+        strategy = compile_strategy(strategy)
+    shoe = Shoe(num_decks, BlackJackCard, penetration, None if seed is None else random.Random(seed))
+    #a hand returns between -200% (doubled and lost) and +200% (doubled and won), in steps of 50%
+    summary = RunningStats(-225, 225, 9)
+    wagered = 0
+    won = 0
+    for hand in range(num_hands):
+        shoe.start_hand()
+        bet, gain = play_hand(shoe, strategy, initial_bet)
+        wagered += bet
+        won += gain
+        summary.add(100*(gain - bet)/initial_bet)
+    return (summary, 100*(won - wagered)/wagered, shoe.shuffles)
+
 def run_all_simulations(strategies):
     """
     Runs a simulation for each strategy in strategies
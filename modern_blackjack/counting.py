@@ -0,0 +1,228 @@
+"""
+Hi-Lo card counting for Modern Blackjack
+"""
+
+'''
+Card counting on a continuous Shoe (see helper.Shoe):
+
+    - HiLoShoe keeps the Hi-Lo running count as cards are dealt: +1 for 2-6, 0 for 7-9,
+      -1 for tens and aces. Every card costs one table lookup and one addition, and a
+      reshuffle resets the count. The true count is the running count per deck left
+    - BetSpread sizes each bet from the true count before the hand is dealt
+    - HiLoStrategy plays basic strategy except for the index plays (deviations) whose
+      true count threshold is met; the dealer's hole card is not counted until it is
+      turned over
+    - run_counting_session plays a long session and reports the rate of return and the
+      variance for each true count bucket
+
+    buckets, rate, shuffles = run_counting_session(1000000, seed=1)
+    print(format_report(buckets))
+'''
+
+import math
+import random
+from helper import BlackJackCard, Shoe
+from blackjack import BlackJackHand, play_hand
+from basic_strategy import basic_strategy
+from running_stats import RunningStats
+
+#Hi-Lo tag of each card value
+HI_LO_TAGS = {2: 1, 3: 1, 4: 1, 5: 1, 6: 1, 7: 0, 8: 0, 9: 0, 10: -1, 11: -1}
+
+#the true count is never divided by less than a quarter of a deck
+MIN_DECKS_LEFT = 0.25
+
+#true counts are reported in buckets from -MAX_BUCKET to +MAX_BUCKET
+MAX_BUCKET = 6
+
+class HiLoShoe(Shoe):
+    """
+    A Shoe that keeps the Hi-Lo running count of the cards dealt since the last shuffle.
+    """
+    def __init__(self, num_decks, card_type=BlackJackCard, penetration=0.75, rng=None):
+        Shoe.__init__(self, num_decks, card_type, penetration, rng)
+        #Hi-Lo tag of each card code
+        self.tags = tuple(HI_LO_TAGS[card.get_val()] for card in self.cards)
+
+    def shuffle(self):
+        Shoe.shuffle(self)
+        self.running_count = 0
+
+    def _reshuffle_discards(self):
+        Shoe._reshuffle_discards(self)
+        #only the cards of the current hand are out of the shoe now
+        self.running_count = sum(self.tags[code] for code in self.codes[self.end:])
+
+    #deal_card and deal_value are Shoe's with the count update inlined (this is the hot path)
+    def deal_card(self):
+        if self.position >= self.end:
+            self._reshuffle_discards()
+        code = self.codes[self.position]
+        self.position += 1
+        self.running_count += self.tags[code]
+        return self.cards[code]
+
+    def deal_value(self):
+        if self.position >= self.end:
+            self._reshuffle_discards()
+        code = self.codes[self.position]
+        self.position += 1
+        self.running_count += self.tags[code]
+        return self.values[code]
+
+    def true_count(self, hide_hole=False):
+        """
+        Returns the running count divided by the number of decks left.
+
+        Parameters:
+        hide_hole - bool, leave out the dealer's hole card (the 4th card of the hand)
+                    while it is still face down
+        """
+        running_count = self.running_count
+        cards_left = self.num_cards_left()
+        hole = self.hand_start + 3
+        if hide_hole and self.end == len(self.codes) and self.position > hole:
+            running_count -= self.tags[self.codes[hole]]
+            cards_left += 1
+        return running_count / max(cards_left / 52, MIN_DECKS_LEFT)
+
+class BetSpread:
+    """
+    Bet sizing from the true count: min_bet times the units of the highest ramp step
+    reached, one unit below the first step.
+    """
+    #(true count, units)
+    DEFAULT_RAMP = ((1, 1), (2, 2), (3, 4), (4, 6), (5, 8))
+
+    def __init__(self, min_bet=1.0, ramp=DEFAULT_RAMP):
+        self.min_bet = min_bet
+        self.ramp = sorted(ramp)
+
+    def bet(self, true_count):
+        units = 1
+        for threshold, step_units in self.ramp:
+            if true_count >= threshold:
+                units = step_units
+        return units * self.min_bet
+
+#(total, soft, upcard) -> (true count index, action at or above it, action below it).
+#The usual Hi-Lo index plays for hit / stand / double; not re-derived for these rules.
+DEFAULT_DEVIATIONS = {
+    (16, 0, 10): (0, BlackJackHand.stand, BlackJackHand.hit),
+    (15, 0, 10): (4, BlackJackHand.stand, BlackJackHand.hit),
+    (16, 0, 9): (5, BlackJackHand.stand, BlackJackHand.hit),
+    (13, 0, 2): (-1, BlackJackHand.stand, BlackJackHand.hit),
+    (13, 0, 3): (-2, BlackJackHand.stand, BlackJackHand.hit),
+    (12, 0, 2): (3, BlackJackHand.stand, BlackJackHand.hit),
+    (12, 0, 3): (2, BlackJackHand.stand, BlackJackHand.hit),
+    (12, 0, 4): (0, BlackJackHand.stand, BlackJackHand.hit),
+    (12, 0, 5): (-2, BlackJackHand.stand, BlackJackHand.hit),
+    (12, 0, 6): (-1, BlackJackHand.stand, BlackJackHand.hit),
+    (11, 0, 11): (1, BlackJackHand.doubledown, BlackJackHand.hit),
+    (10, 0, 10): (4, BlackJackHand.doubledown, BlackJackHand.hit),
+    (10, 0, 11): (4, BlackJackHand.doubledown, BlackJackHand.hit),
+    (9, 0, 2): (1, BlackJackHand.doubledown, BlackJackHand.hit),
+    (9, 0, 7): (3, BlackJackHand.doubledown, BlackJackHand.hit),
+}
+
+class HiLoStrategy:
+    """
+    A playing strategy that follows base (basic strategy by default) except for the
+    deviations, decided on the true count of the HiLoShoe the hand is dealt from.
+    """
+    def __init__(self, base=None, deviations=DEFAULT_DEVIATIONS):
+        self.base = base or basic_strategy()
+        self.deviations = deviations
+        self.__name__ = 'hi_lo_strategy'
+
+    def __call__(self, hand):
+        total, soft = BlackJackHand.hand_state(hand.player)
+        deviation = self.deviations.get((total, int(soft > 0), hand.dealer[0].get_val()))
+        if deviation is None or total > 21:
+            return self.base(hand)
+        index, at_or_above, below = deviation
+        return at_or_above if hand.deck.true_count(hide_hole=True) >= index else below
+
+class CountBucket:
+    """
+    Results of the hands started at one true count.
+    """
+    def __init__(self):
+        #net return of each hand, in % of its initial bet: -200% (doubled and lost)
+        #to +200% (doubled and won), in steps of 50%
+        self.stats = RunningStats(-225, 225, 9)
+        self.wagered = 0.0
+        self.won = 0.0
+
+    def add(self, initial_bet, wagered, won):
+        self.stats.add(100*(won - wagered)/initial_bet)
+        self.wagered += wagered
+        self.won += won
+
+    @property
+    def hands(self):
+        return self.stats.count
+
+    @property
+    def rate_of_return(self):
+        #net return over the amount wagered (%)
+        return 100*(self.won - self.wagered)/self.wagered if self.wagered else 0.0
+
+def count_bucket(true_count):
+    return min(max(math.floor(true_count), -MAX_BUCKET), MAX_BUCKET)
+
+def run_counting_session(num_hands, strategy=None, spread=None, num_decks=8, penetration=0.75,
+                         seed=None):
+    """
+    Plays num_hands hands on one HiLoShoe, sizing each bet with spread.
+
+    Parameters:
+    num_hands - int, the number of hands in the session
+    strategy - the playing strategy, a HiLoStrategy with the default deviations if None;
+               any strategy of BlackJackHand or DecisionTable works too (flat play)
+    spread - BetSpread, the default ramp with a minimum bet of 1 if None;
+             BetSpread(ramp=()) bets flat
+    num_decks, penetration - the shoe, as in helper.Shoe
+    seed - int, seed of the shuffles (default=None)
+
+    Returns:
+    tuple:
+        - dict, true count bucket (the true count before the hand, rounded down) -> CountBucket
+        - float, the rate of return of the whole session (%)
+        - int, the number of times the shoe was reshuffled
+    """
+    strategy = strategy or HiLoStrategy()
+    spread = spread or BetSpread()
+    shoe = HiLoShoe(num_decks, BlackJackCard, penetration,
+                    None if seed is None else random.Random(seed))
+    buckets = {}
+    wagered = 0.0
+    won = 0.0
+    for hand in range(num_hands):
+        shoe.start_hand()
+        true_count = shoe.true_count()
+        initial_bet = spread.bet(true_count)
+        bet, gain = play_hand(shoe, strategy, initial_bet)
+        bucket = count_bucket(true_count)
+        if bucket not in buckets:
+            buckets[bucket] = CountBucket()
+        buckets[bucket].add(initial_bet, bet, gain)
+        wagered += bet
+        won += gain
+    return buckets, 100*(won - wagered)/wagered, shoe.shuffles
+
+def format_report(buckets):
+    """
+    Returns a table of hands, rate of return and standard deviation per true count bucket.
+    """
+    lines = ['  TC     hands   ROI %    SD %']
+    for bucket in sorted(buckets):
+        result = buckets[bucket]
+        lines.append('%+4d %9d %7.2f %7.1f' % (bucket, result.hands, result.rate_of_return,
+                                               result.stats.std))
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    buckets, rate, shuffles = run_counting_session(200000, seed=1)
+    print(format_report(buckets))
+    print('Rate of return: %.3f%% (%d shuffles)' % (rate, shuffles))
@@ -0,0 +1,120 @@
+"""
+Dealer outcome distributions for Modern Blackjack, computed once and cached
+"""
+
+'''
+P(dealer's final total | dealer's hand, cards left in the shoe) is what every
+analytic calculation needs: expected values, strategy solvers, variance reduced
+simulations. This module computes it exactly and shares one cache between them.
+
+    - a shoe composition is a tuple of counts of each card value 2-11 (aces are 11),
+      see shoe_counts; with infinite=True the counts only give the proportions and
+      drawing never changes them
+    - a distribution is a tuple of probabilities of DEALER_OUTCOMES: final totals
+      17-21, then bust (the dealer draws to 17 and stands on all 17s, like
+      play_dealer_turn)
+    - results are memoized on (dealer total, soft, composition, infinite) in an LRU
+      cache of CACHE_SIZE entries, so the many shoes met while analyzing a finite
+      shoe don't grow memory without bound
+
+    dealer_distribution(16, 0, shoe_counts(8))     dealer showing a hard 16
+    upcard_distribution(10, shoe_counts(8))        dealer's upcard is a 10, no blackjack
+'''
+
+from functools import lru_cache
+from blackjack import BlackJackHand
+
+#card values 2-11, aces are 11
+CARD_VALUES = tuple(range(2, 12))
+
+#dealer outcomes, in the order of a distribution: final totals 17-21, then bust
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, 'bust')
+BUST = 5
+
+#memoized dealer hands (all the intermediate hands of a calculation count)
+CACHE_SIZE = 1 << 20
+
+def shoe_counts(num_decks=1):
+    """
+    Returns:
+    tuple, the number of cards of each value 2-11 in num_decks decks
+    """
+    return tuple(16 * num_decks if value == 10 else 4 * num_decks for value in CARD_VALUES)
+
+def draws(counts, infinite=False):
+    """
+    Returns:
+    list of (card value, probability, counts after the draw), for every value
+    still in the shoe
+    """
+    left = sum(counts)
+    result = []
+    for index, count in enumerate(counts):
+        if count:
+            after = counts
+            if not infinite:
+                after = counts[:index] + (count - 1,) + counts[index + 1:]
+            result.append((CARD_VALUES[index], count / left, after))
+    return result
+
+@lru_cache(maxsize=CACHE_SIZE)
+def dealer_distribution(total, soft, counts, infinite=False):
+    """
+    Returns the probabilities of DEALER_OUTCOMES for a dealer hand of state
+    (total, soft) (see BlackJackHand.hand_state) drawing from the shoe counts.
+    """
+    distribution = [0.0] * 6
+    if total >= 17:
+        distribution[BUST if total > 21 else total - 17] = 1.0
+        return tuple(distribution)
+    for value, probability, after in draws(counts, infinite):
+        next_total, next_soft = BlackJackHand.add_card(total, soft, value)
+        if next_total >= 17:
+            #the dealer stands (or busts) right away, no need to recurse
+            distribution[BUST if next_total > 21 else next_total - 17] += probability
+            continue
+        for outcome, p in enumerate(dealer_distribution(next_total, next_soft, after, infinite)):
+            distribution[outcome] += probability * p
+    return tuple(distribution)
+
+@lru_cache(maxsize=1024)
+def upcard_distribution(upcard, counts, infinite=False):
+    """
+    Returns the distribution of the dealer's final total when only the upcard is known,
+    and the dealer is known not to have a blackjack (play_hand settles those before
+    the player's turn). counts is the shoe the hole card comes from.
+    """
+    distribution = [0.0] * 6
+    weight = 0.0
+    for hole, probability, after in draws(counts, infinite):
+        total, soft = BlackJackHand.add_card(*BlackJackHand.add_card(0, 0, upcard), hole)
+        if total == 21:
+            continue
+        weight += probability
+        for outcome, p in enumerate(dealer_distribution(total, soft, after, infinite)):
+            distribution[outcome] += probability * p
+    return tuple(p / weight for p in distribution)
+
+def stand_value(total, distribution):
+    """
+    Returns the player's expected net return per unit bet when standing on total
+    against a dealer distribution.
+    """
+    value = distribution[BUST]
+    for outcome, p in enumerate(distribution[:BUST]):
+        if total > 17 + outcome:
+            value += p
+        elif total < 17 + outcome:
+            value -= p
+    return value
+
+def cache_info():
+    """
+    Returns the functools cache statistics (hits, misses, maxsize, currsize) of
+    dealer_distribution.
+    """
+    return dealer_distribution.cache_info()
+
+def clear_cache():
+    dealer_distribution.cache_clear()
+    upcard_distribution.cache_clear()
@@ -0,0 +1,124 @@
+"""
+Exact expected value of a playing strategy in Modern Blackjack
+"""
+
+'''
+Instead of simulating hands, this module works out the exact expected return of a
+strategy under the rules of play_hand:
+
+    - 2.5 times the bet for a blackjack (a push if the dealer has one too),
+      nothing if only the dealer has one
+    - doubling down on any turn: the bet doubles, one more card, then stand
+    - the dealer draws to 17 and stands on all 17s
+    - 2 times the bet for a win, the bet back for a tie
+
+A shoe is a tuple of counts of each card value 2-11 (aces are 11). The recursion runs
+over the states of the player's turn (total, soft, dealer upcard, dealer hole card,
+cards left in the shoe), with the dealer outcome distributions of dealer_outcomes:
+
+    - infinite deck: drawing a card never changes the shoe, every hand state is
+      evaluated once
+    - finite shoe: every card dealt is taken out of the shoe, so the answer is exact
+      for the first hand dealt from a freshly shuffled shoe of num_decks decks
+'''
+
+from blackjack import BlackJackHand, DecisionTable, compile_strategy
+from dealer_outcomes import dealer_distribution, draws, shoe_counts, stand_value
+
+class _Shoe:
+    """
+    Draws from a shoe, with memoized player values.
+    """
+    def __init__(self, infinite):
+        self.infinite = infinite
+        self._values = {}
+
+    def draws(self, counts):
+        return draws(counts, self.infinite)
+
+    def stand_value(self, total, dealer, counts):
+        #net return of standing on total, per unit bet
+        return stand_value(total, dealer_distribution(dealer[0], dealer[1], counts, self.infinite))
+
+    def player_value(self, table, total, soft, upcard, hole, dealer, counts):
+        """
+        Returns (net return, expected extra bet from doubling down), per unit of the
+        initial bet, for the player's turn from state (total, soft).
+        """
+        if total > 21:
+            return (-1.0, 0.0)
+        key = (total, soft > 0, upcard, hole, counts)
+        result = self._values.get(key)
+        if result is not None:
+            return result
+        action = table.lookup(total, soft, upcard, hole)
+        if action == DecisionTable.STAND:
+            result = (self.stand_value(total, dealer, counts), 0.0)
+        elif action == DecisionTable.DOUBLE:
+            #twice the bet on the outcome of exactly one more card
+            value = 0.0
+            for card, probability, after in self.draws(counts):
+                next_total, _ = BlackJackHand.add_card(total, soft, card)
+                outcome = -1.0 if next_total > 21 else self.stand_value(next_total, dealer, after)
+                value += probability * 2 * outcome
+            result = (value, 1.0)
+        else:
+            value = 0.0
+            extra = 0.0
+            for card, probability, after in self.draws(counts):
+                next_total, next_soft = BlackJackHand.add_card(total, soft, card)
+                outcome, more = self.player_value(table, next_total, next_soft, upcard,
+                                                  hole, dealer, after)
+                value += probability * outcome
+                extra += probability * more
+            result = (value, extra)
+        self._values[key] = result
+        return result
+
+def strategy_ev(strategy, num_decks=None):
+    """
+    Computes the exact expected outcome of one hand played with strategy.
+
+    Parameters:
+    strategy - function, a playing strategy of BlackJackHand, or a DecisionTable
+    num_decks - int, the number of decks in a freshly shuffled shoe,
+                or None for an infinite deck (default=None)
+
+    Returns:
+    tuple (float, float):
+        - the expected net return per unit of initial bet
+        - the expected amount wagered per unit of initial bet (more than 1 with doubling down)
+    """
+    table = compile_strategy(strategy)
+    infinite = num_decks is None
+    shoe = _Shoe(infinite)
+    counts = shoe_counts(1 if infinite else num_decks)
+    net = 0.0
+    wagered = 0.0
+    #deal order: player, dealer, player, dealer
+    for first, p1, counts1 in shoe.draws(counts):
+        for upcard, p2, counts2 in shoe.draws(counts1):
+            for second, p3, counts3 in shoe.draws(counts2):
+                for hole, p4, counts4 in shoe.draws(counts3):
+                    probability = p1 * p2 * p3 * p4
+                    total, soft = BlackJackHand.add_card(*BlackJackHand.add_card(0, 0, first), second)
+                    dealer = BlackJackHand.add_card(*BlackJackHand.add_card(0, 0, upcard), hole)
+                    wagered += probability
+                    if total == 21:
+                        net += probability * (0.0 if dealer[0] == 21 else 1.5)
+                    elif dealer[0] == 21:
+                        net -= probability
+                    else:
+                        value, extra = shoe.player_value(table, total, soft, upcard, hole,
+                                                         dealer, counts4)
+                        net += probability * value
+                        wagered += probability * extra
+    return (net, wagered)
+
+def rate_of_return(strategy, num_decks=None):
+    """
+    Returns the expected rate of return (%), the net return over the amount wagered,
+    which is what run_simulation estimates.
+    """
+    net, wagered = strategy_ev(strategy, num_decks)
+    return 100 * net / wagered
@@ -27,27 +27,59 @@ class BlackJackCard(Card):
     """
     Represent a playing card.
     """
+    #maximum point value of each rank, worked out once
+    rank_values = {rank: 11 if rank == 'A' else 10 if rank in ('J', 'Q', 'K') else int(rank)
+                   for rank in Card.rank_names}
+
     def get_val(self):
         """
         Returns the maximum point value of the card in a game of blackjack.
         """
-        rank = self.get_rank()
-        if rank == 'A':
-            return 11
-        if rank in ('J', 'Q', 'K'):
-            return 10
-        else:
-            return int(rank)
+        return BlackJackCard.rank_values[self.rank]
 
 class CardDecks:
     """
     Represent a blackjack card deck with one or more standard card decks.
+
+    The shoe is a bytearray of card codes, each code the index of a card in
+    create_deck(card_type). Cards are dealt by moving a position along the shoe,
+    and shuffle() reshuffles the same bytearray in place, so a shoe can be reused
+    for every trial. deal_card returns one shared card object per code (cards are
+    never modified), and deal_value the precomputed point value.
     """
-    def __init__(self, num_decks, card_type):
-        self.val = []
-        for _ in range(num_decks):
-            self.val += CardDecks.create_deck(card_type)
-        random.shuffle(self.val)
+    #card_type -> the 52 card objects shared by all shoes of that type
+    _cards = {}
+
+    def __init__(self, num_decks, card_type, rng=None):
+        """
+        Parameters:
+        num_decks - int, the number of standard decks in the shoe
+        card_type - the card class, e.g. BlackJackCard
+        rng - random.Random used for shuffling, the random module if None
+        """
+        self.cards = CardDecks.shared_cards(card_type)
+        if hasattr(card_type, 'get_val'):
+            self.values = bytes(card.get_val() for card in self.cards)
+        self.codes = bytearray(range(len(self.cards))) * num_decks
+        self.rng = rng or random
+        self.shuffle()
+
+    @staticmethod
+    def shared_cards(card_type):
+        """
+        Returns the 52 cards of one deck, created once per card type.
+        """
+        cards = CardDecks._cards.get(card_type)
+        if cards is None:
+            cards = CardDecks._cards[card_type] = tuple(CardDecks.create_deck(card_type))
+        return cards
+
+    def shuffle(self):
+        """
+        Puts every card back in the shoe and shuffles it in place.
+        """
+        self.rng.shuffle(self.codes)
+        self.position = 0
 
     @staticmethod
     def create_deck(card_type):
@@ -58,13 +90,87 @@ class CardDecks:
         return result
 
     def deal_card(self):
-        try:
-            return self.val.pop()
-        except:
+        if self.position >= len(self.codes):
+            raise ValueError('Deck Empty')
+        self.position += 1
+        return self.cards[self.codes[self.position - 1]]
+
+    def deal_value(self):
+        """
+        Deals the next card and returns its point value only.
+        """
+        if self.position >= len(self.codes):
             raise ValueError('Deck Empty')
+        self.position += 1
+        return self.values[self.codes[self.position - 1]]
+
+    def num_cards_left(self):
+        return len(self.codes) - self.position
+
+class Shoe(CardDecks):
+    """
+    A casino shoe for long sessions: the same decks dealt again and again, down to a cut card.
+
+    The cut card is placed after penetration (the fraction of the shoe dealt between
+    shuffles). start_hand() must be called before each hand: once the cut card has
+    come out, the shoe is reshuffled in place before the next hand starts, so a session
+    of any length uses the same memory and never runs out of cards. If a hand runs
+    out of cards anyway (a cut card very deep in a small shoe), the discards are
+    shuffled in place and dealt to finish it.
+    """
+    def __init__(self, num_decks, card_type, penetration=0.75, rng=None):
+        """
+        Parameters:
+        num_decks - int, the number of standard decks in the shoe
+        card_type - the card class, e.g. BlackJackCard
+        penetration - float in (0, 1], the fraction of the shoe dealt before the cut card
+        rng - random.Random used for shuffling, the random module if None
+        """
+        if not 0 < penetration <= 1:
+            raise ValueError('Penetration must be between 0 and 1')
+        CardDecks.__init__(self, num_decks, card_type, rng)
+        self.cut_card = max(1, int(penetration * len(self.codes)))
+        #reshuffles at the cut card so far
+        self.shuffles = 0
+
+    def shuffle(self):
+        CardDecks.shuffle(self)
+        #cards can be dealt up to end; the current hand started at hand_start
+        self.end = len(self.codes)
+        self.hand_start = 0
+
+    def start_hand(self):
+        """
+        Reshuffles if the cut card came out during the last hand, then starts a new hand.
+        """
+        if self.position >= self.cut_card or self.end != len(self.codes):
+            self.shuffle()
+            self.shuffles += 1
+        self.hand_start = self.position
+
+    def _reshuffle_discards(self):
+        #out of cards in the middle of a hand: deal the discards again, shuffled,
+        #leaving the cards of this hand where they are
+        if self.end != len(self.codes) or self.hand_start == 0:
+            raise ValueError('Deck Empty')
+        self.rng.shuffle(memoryview(self.codes)[:self.hand_start])
+        self.end = self.hand_start
+        self.position = 0
+
+    def deal_card(self):
+        if self.position >= self.end:
+            self._reshuffle_discards()
+        self.position += 1
+        return self.cards[self.codes[self.position - 1]]
+
+    def deal_value(self):
+        if self.position >= self.end:
+            self._reshuffle_discards()
+        self.position += 1
+        return self.values[self.codes[self.position - 1]]
 
     def num_cards_left(self):
-        return len(self.val)
+        return self.end - self.position
 
 
 class Busted(Exception):
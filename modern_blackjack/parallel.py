@@ -0,0 +1,104 @@
+"""
+Parallel simulation runner for Modern Blackjack
+"""
+
+'''
+run_simulation plays every trial on one core and keeps every rate of return.
+run_parallel splits the trials into shards of shard_size trials and plays the shards
+on a process pool:
+
+    - shard i always gets the i-th child of numpy's SeedSequence(seed), so a run with
+      the same seed and shard_size plays the same trials on any number of processes
+    - a worker sends back a RunningStats (count, mean, M2, histogram) for its shard,
+      never the rates, and the parent merges them in shard order, so the totals are
+      the same to the last bit on any number of processes
+
+Memory therefore stays flat however many trials are run, and wall time goes down
+with the number of cores.
+
+    stats = run_parallel(BlackJackHand.simple_strategy, num_trials=500000, seed=1)
+    print(stats)
+'''
+
+import os
+import random
+from multiprocessing import Pool
+import numpy as np
+from running_stats import RunningStats
+
+#trials per shard: big enough to keep the vectorized engine busy, small enough to balance
+DEFAULT_SHARD_SIZE = 8192
+
+def _run_shard(job):
+    #one shard of trials -> RunningStats of their rates
+    strategy, initial_bet, num_decks, num_hands, num_trials, seed, vectorized, compiled = job
+    stats = RunningStats()
+    if vectorized:
+        from vectorized import simulate_rates
+        stats.add_many(simulate_rates(strategy, initial_bet, num_decks, num_hands,
+                                      num_trials, seed))
+    else:
+        from blackjack import _simulate_rates, compile_strategy
+        rng = random.Random(seed.generate_state(4).tobytes())
+        if compiled:
+            strategy = compile_strategy(strategy)
+        stats.add_many(_simulate_rates(strategy, initial_bet, num_decks, num_hands, num_trials,
+                                       rng))
+    return stats
+
+def _jobs(strategy, initial_bet, num_decks, num_hands, num_trials, seed, vectorized, compiled,
+          shard_size):
+    num_shards = (num_trials + shard_size - 1) // shard_size
+    seeds = np.random.SeedSequence(seed).spawn(num_shards)
+    for index, shard_seed in enumerate(seeds):
+        trials = min(shard_size, num_trials - index * shard_size)
+        yield (strategy, initial_bet, num_decks, num_hands, trials, shard_seed, vectorized,
+               compiled)
+
+def run_parallel(strategy, initial_bet=2.0, num_decks=8, num_hands=20, num_trials=100,
+                 seed=None, processes=None, vectorized=True, shard_size=DEFAULT_SHARD_SIZE,
+                 compiled=None):
+    """
+    Runs the trials of run_simulation on a process pool.
+
+    Parameters:
+    strategy - function, a playing strategy of BlackJackHand (or any picklable one)
+    seed - int or None, root seed of the random streams of all shards
+    processes - int, the number of worker processes, all cores if None;
+                1 runs the shards in this process
+    vectorized - bool, play the shards with the vectorized engine (default=True)
+    shard_size - int, the number of trials per shard
+    compiled - bool, play the strategy compiled into a DecisionTable; None compiles the
+               strategies of BlackJackHand and DecisionTables only, and the vectorized
+               engine needs compiled strategies (as in run_simulation)
+    (other parameters as in run_simulation)
+
+    Returns:
+    RunningStats of the player's rates of return (%) over all trials
+    """
+    from blackjack import compiled_by_default
+    if compiled is None:
+        compiled = compiled_by_default(strategy)
+    if vectorized and not compiled:
+        raise ValueError('The vectorized engine only plays compiled strategies, vectorized needs compiled=True')
+    total = RunningStats()
+    jobs = _jobs(strategy, initial_bet, num_decks, num_hands, num_trials, seed,
+                 vectorized, compiled, shard_size)
+    if processes == 1:
+        for job in jobs:
+            total.merge(_run_shard(job))
+        return total
+    with Pool(processes or os.cpu_count()) as pool:
+        #merged in shard order: the floating point sums then don't depend on the pool
+        for stats in pool.imap(_run_shard, jobs):
+            total.merge(stats)
+    return total
+
+def run_all_parallel(strategies, **kwargs):
+    """
+    Runs run_parallel for each strategy in strategies.
+
+    Returns:
+    dict, strategy name -> RunningStats
+    """
+    return {strategy.__name__: run_parallel(strategy, **kwargs) for strategy in strategies}
@@ -0,0 +1,128 @@
+"""
+Mergeable summary statistics for simulation results
+"""
+
+'''
+RunningStats keeps what the simulations report about the rates of return without
+keeping the rates themselves:
+
+    - count, mean and M2 (sum of squared distances to the mean), updated with
+      Welford's method one value at a time, or a whole NumPy array at a time
+    - a histogram over fixed bins, so histograms of different runs line up
+
+Two RunningStats over different trials merge into the RunningStats of all the trials
+(Chan et al. parallel update), which is how the shards of parallel.py are combined.
+Memory stays the same however many trials are added.
+'''
+
+import math
+from statistics import NormalDist
+import numpy as np
+
+class RunningStats:
+    """
+    Count, mean, variance and histogram of a stream of values.
+    """
+    #a trial's rate of return (%) lies between losing every bet and a blackjack every hand
+    LOW = -100.0
+    HIGH = 150.0
+    NUM_BINS = 100
+
+    def __init__(self, low=LOW, high=HIGH, num_bins=NUM_BINS):
+        """
+        Parameters:
+        low, high - float, range of the histogram; values outside it are counted
+                    in the first or last bin
+        num_bins - int, the number of histogram bins of equal width
+        """
+        self.low = low
+        self.high = high
+        self.num_bins = num_bins
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.histogram = np.zeros(num_bins, dtype=np.int64)
+
+    def _bin(self, value):
+        index = int((value - self.low) * self.num_bins / (self.high - self.low))
+        return min(max(index, 0), self.num_bins - 1)
+
+    def add(self, value):
+        """
+        Adds one value (Welford's update).
+        """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.histogram[self._bin(value)] += 1
+
+    def add_many(self, values):
+        """
+        Adds an array of values at once.
+        """
+        values = np.asarray(values, dtype=float)
+        if values.size == 0:
+            return
+        batch = RunningStats(self.low, self.high, self.num_bins)
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        counts, _ = np.histogram(np.clip(values, self.low, self.high),
+                                 bins=self.num_bins, range=(self.low, self.high))
+        batch.histogram += counts
+        self.merge(batch)
+
+    def merge(self, other):
+        """
+        Adds all the values summarized by other, a RunningStats with the same bins.
+
+        Returns:
+        self
+        """
+        if (other.low, other.high, other.num_bins) != (self.low, self.high, self.num_bins):
+            raise ValueError('Histogram bins differ')
+        count = self.count + other.count
+        if count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.histogram += other.histogram
+        return self
+
+    @property
+    def variance(self):
+        #population variance, like np.var
+        return self.m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def standard_error(self):
+        #of the mean, with the sample (n - 1) variance
+        if self.count < 2:
+            return math.inf
+        return math.sqrt(self.m2 / (self.count - 1) / self.count)
+
+    def half_width(self, confidence=0.95):
+        """
+        Returns the half width of the normal confidence interval of the mean.
+        """
+        return NormalDist().inv_cdf(0.5 + confidence / 2) * self.standard_error
+
+    def confidence_interval(self, confidence=0.95):
+        """
+        Returns:
+        tuple (low, high), the normal confidence interval of the mean
+        """
+        half_width = self.half_width(confidence)
+        return (self.mean - half_width, self.mean + half_width)
+
+    def bin_edges(self):
+        return np.linspace(self.low, self.high, self.num_bins + 1)
+
+    def __str__(self):
+        return 'n = %d, mean = %.4f%%, SD = %.4f%%' % (self.count, self.mean, self.std)
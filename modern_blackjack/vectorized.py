@@ -0,0 +1,185 @@
+"""
+Vectorized Monte Carlo engine for Modern Blackjack
+"""
+
+'''
+run_simulation in blackjack.py plays one hand at a time through BlackJackHand and
+BlackJackCard objects. This module plays the same game on NumPy arrays instead:
+
+    1. Every trial gets its own shoe, an int8 row of card values (2-10, aces are 11),
+       shuffled with one call for the whole batch of trials
+
+    2. All trials of a batch play their hands in lockstep. Dealing a card reads
+       shoes[trial, position] for every trial at once and moves the position on
+       only for the trials that took a card
+
+    3. The strategy is not called during play. It is compiled into a DecisionTable
+       (blackjack.compile_strategy) indexed by (player total, soft flag, dealer upcard,
+       dealer hole card). Hit / stand / doubledown steps are then masked array updates,
+       repeated until no trial wants another card
+
+The payouts are those of play_hand.
+'''
+
+import numpy as np
+from helper import BlackJackCard, Card
+from blackjack import DecisionTable, compile_strategy
+
+STAND = DecisionTable.STAND
+HIT = DecisionTable.HIT
+DOUBLE = DecisionTable.DOUBLE
+
+ACE = 11
+
+#trials played together; a batch holds batch_size shoes in memory
+DEFAULT_BATCH_SIZE = 4096
+
+def shoe_values(num_decks):
+    """
+    Returns the card values of num_decks unshuffled decks.
+
+    Returns:
+    numpy int8 array of length 52*num_decks, aces are 11
+    """
+    deck = [BlackJackCard(r, s).get_val() for r in Card.rank_names for s in Card.suit_names]
+    return np.array(deck * num_decks, dtype=np.int8)
+
+def _add_card(total, soft, card):
+    #best value and number of aces still counted as 11, after adding card
+    total = total + card
+    soft = soft + (card == ACE)
+    #a card adds at most 11 to a total of at most 21, so two aces turned to 1 is enough
+    for _ in range(2):
+        reduce = (total > 21) & (soft > 0)
+        total = total - 10 * reduce
+        soft = soft - reduce
+    return total, soft
+
+class _Dealer:
+    """
+    Deals from a batch of shoes, one position per trial.
+    """
+    def __init__(self, shoes):
+        self.shoes = shoes
+        self.rows = np.arange(shoes.shape[0])
+        self.pos = np.zeros(shoes.shape[0], dtype=np.intp)
+        self.size = shoes.shape[1]
+
+    def deal(self, mask=None):
+        #returns the next card of every shoe; only shoes in mask move on
+        if mask is None:
+            if self.pos.max() >= self.size:
+                raise ValueError('Deck Empty')
+            card = self.shoes[self.rows, self.pos].astype(np.int16)
+            self.pos += 1
+            return card
+        if (self.pos[mask] >= self.size).any():
+            raise ValueError('Deck Empty')
+        card = self.shoes[self.rows, np.minimum(self.pos, self.size - 1)].astype(np.int16)
+        self.pos += mask
+        return card
+
+def play_hands(shoes, table, num_hands, initial_bet=1.0):
+    """
+    Plays num_hands hands on each shoe, all shoes in lockstep.
+
+    Parameters:
+    shoes - numpy int8 array, one shuffled shoe per row
+    table - DecisionTable of the strategy
+    num_hands - int, the number of hands played on each shoe
+    initial_bet - float, the bet of each hand before doubling down
+
+    Returns:
+    tuple of numpy arrays, one entry per shoe: (amount_wagered, amount_won)
+    """
+    actions = table.array
+    dealer = _Dealer(shoes)
+    num_trials = shoes.shape[0]
+    wagered = np.zeros(num_trials)
+    won = np.zeros(num_trials)
+    zero = np.zeros(num_trials, dtype=np.int16)
+    for _ in range(num_hands):
+        #player, dealer, player, dealer
+        p_total, p_soft = _add_card(zero, zero, dealer.deal())
+        upcard = dealer.deal()
+        p_total, p_soft = _add_card(p_total, p_soft, dealer.deal())
+        hole = dealer.deal()
+        d_total, d_soft = _add_card(*_add_card(zero, zero, upcard), hole)
+        player_blackjack = p_total == 21
+        dealer_blackjack = d_total == 21
+        bet = np.full(num_trials, float(initial_bet))
+
+        #player's turn: a hit keeps the trial going, a doubledown or a bust ends it
+        active = ~(player_blackjack | dealer_blackjack)
+        while active.any():
+            action = actions[np.minimum(p_total, 21), np.minimum(p_soft, 1), upcard, hole]
+            action = np.where(active, action, STAND)
+            draw = action != STAND
+            if not draw.any():
+                break
+            new_total, new_soft = _add_card(p_total, p_soft, dealer.deal(draw))
+            p_total = np.where(draw, new_total, p_total)
+            p_soft = np.where(draw, new_soft, p_soft)
+            bet = np.where(action == DOUBLE, 2 * bet, bet)
+            active = (action == HIT) & (p_total <= 21)
+
+        #dealer's turn, only if the player is still in the game
+        player_busted = p_total > 21
+        active = ~(player_blackjack | dealer_blackjack | player_busted) & (d_total < 17)
+        while active.any():
+            new_total, new_soft = _add_card(d_total, d_soft, dealer.deal(active))
+            d_total = np.where(active, new_total, d_total)
+            d_soft = np.where(active, new_soft, d_soft)
+            active &= d_total < 17
+
+        #same payouts as play_hand
+        payout = np.select(
+            [player_blackjack & dealer_blackjack, player_blackjack, dealer_blackjack,
+             player_busted, d_total > 21, p_total > d_total, p_total == d_total],
+            [1.0, 2.5, 0.0, 0.0, 2.0, 2.0, 1.0],
+            0.0)
+        wagered += bet
+        won += payout * bet
+    return wagered, won
+
+def simulate_rates(strategy, initial_bet=2.0, num_decks=8, num_hands=20, num_trials=100,
+                   seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Runs num_trials trials of num_hands hands, each trial on a freshly shuffled shoe.
+
+    Parameters:
+    strategy - function, a playing strategy taking a BlackJackHand, or a DecisionTable
+    seed - int, numpy SeedSequence or Generator, or None: seed of the NumPy random generator
+    batch_size - int, the number of trials played in lockstep
+    (other parameters as in run_simulation)
+
+    Returns:
+    numpy array of the player's rate of return (%) for each trial
+    """
+    rng = np.random.default_rng(seed)
+    table = compile_strategy(strategy)
+    values = shoe_values(num_decks)
+    rates = np.empty(num_trials)
+    for start in range(0, num_trials, batch_size):
+        stop = min(start + batch_size, num_trials)
+        shoes = np.tile(values, (stop - start, 1))
+        rng.permuted(shoes, axis=1, out=shoes)
+        wagered, won = play_hands(shoes, table, num_hands, initial_bet)
+        rates[start:stop] = 100 * (won - wagered) / wagered
+    return rates
+
+def run_simulation(strategy, initial_bet=2.0, num_decks=8, num_hands=20, num_trials=100,
+                   seed=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Vectorized counterpart of blackjack.run_simulation (without the plot).
+
+    Returns:
+
+        tuple:
+            - list of the player's rate of return for each trial
+            - float, the average rate of return across all the trials
+            - float, the standard deviation of rates of return across all trials
+    """
+    rates = simulate_rates(strategy, initial_bet, num_decks, num_hands, num_trials,
+                           seed, batch_size)
+    return (rates.tolist(), np.mean(rates), np.std(rates))